@@ -1,31 +1,90 @@
 """
 命令行界面模块
 """
-import json
+import asyncio
+import collections
+import multiprocessing
 import os
 from pathlib import Path
-from typing import List, Optional
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+)
 
 import click
-from rich.console import Console
-from rich.table import Table
-
-from .config import ConfigManager
-from .core import (
-    BackupManager,
-    BlacklistManager,
-    ChunkManager,
-    DisplayManager,
-    FileMatcher,
-    PromptManager,
-    RetryHandler,
-    Translator,
-    YAMLHandler,
-)
-from .utils import log
 
+# 其余依赖在命令函数内按需导入，--help 等命令只需加载click
+if TYPE_CHECKING:
+    from tenacity import AsyncRetrying
+
+    from .config import Config, ConfigManager, RetryConfig
+    from .core import (
+        DisplayManager,
+        PromptManager,
+        RetryHandler,
+        Translator,
+        YAMLHandler,
+    )
+
+
+class _LazyObject:
+    """延迟创建的对象代理，首次访问属性时才调用工厂函数"""
+
+    def __init__(self, factory: Callable[[], Any]):
+        self._factory = factory
+        self._obj: Any = None
 
-console = Console()
+    def __getattr__(self, name: str) -> Any:
+        if self._obj is None:
+            self._obj = self._factory()
+        return getattr(self._obj, name)
+
+
+def _create_console() -> Any:
+    from rich.console import Console
+    
+    return Console()
+
+
+def _load_logger() -> Any:
+    from .utils import log
+    
+    return log
+
+
+console = _LazyObject(_create_console)
+log = _LazyObject(_load_logger)
+
+ManagerT = TypeVar("ManagerT")
+
+
+def _get_manager(ctx: click.Context, cls: Type[ManagerT], config_attr: str) -> ManagerT:
+    """获取共享的管理器实例
+    
+    同一进程内的多个子命令复用同一个管理器，避免重复读取黑名单文件、模板目录和备份索引。
+    
+    Args:
+        ctx: click上下文
+        cls: 管理器类
+        config_attr: 管理器使用的配置项名称
+        
+    Returns:
+        ManagerT: 管理器实例
+    """
+    managers = ctx.obj.setdefault("managers", {})
+    if cls.__name__ not in managers:
+        config = ctx.obj["config"]
+        managers[cls.__name__] = cls(getattr(config, config_attr))
+    return managers[cls.__name__]
 
 
 @click.group()
@@ -44,10 +103,13 @@ def cli(ctx: click.Context, config: Optional[str], verbose: bool, quiet: bool) -
 
     支持批量翻译YAML文件，保持原有格式和注释，支持黑名单词汇保护。
     """
+    from .config import ConfigManager
+    
     # 加载配置
     ctx.ensure_object(dict)
     config_manager = ConfigManager(config)
     ctx.obj["config"] = config_manager
+    ctx.obj["managers"] = {}
     
     # 加载默认配置
     config_manager.load()
@@ -92,6 +154,11 @@ def cli(ctx: click.Context, config: Optional[str], verbose: bool, quiet: bool) -
     is_flag=True,
     help="仅显示要处理的文件，不实际翻译",
 )
+@click.option(
+    "--cpu-pool",
+    is_flag=True,
+    help="使用多进程处理文件（适合大量或较大的文件）",
+)
 @click.pass_context
 def translate(
     ctx: click.Context,
@@ -100,11 +167,21 @@ def translate(
     exclude: List[str],
     recursive: bool,
     dry_run: bool,
+    cpu_pool: bool,
 ) -> None:
     """翻译YAML文件
 
     PATH可以是单个文件或目录。如果是目录，将处理目录下所有匹配的YAML文件。
     """
+    from .core import (
+        DisplayManager,
+        FileMatcher,
+        PromptManager,
+        RetryHandler,
+        Translator,
+        YAMLHandler,
+    )
+    
     config = ctx.obj["config"]
     
     try:
@@ -131,83 +208,39 @@ def translate(
         
         # 创建必要的组件
         yaml_handler = YAMLHandler(config.yaml)
-        chunk_manager = ChunkManager(config.chunk)
-        prompt_manager = PromptManager(config.prompt)
-        translator = Translator(config.translation)
+        prompt_manager = _get_manager(ctx, PromptManager, "prompt")
+        translator = Translator(
+            config.api,
+            config.translation,
+            config.blacklist,
+            cache_config=config.cache,
+        )
         retry_handler = RetryHandler(config.retry)
         display = DisplayManager(config.display)
         
+        # 添加任务
+        for file_path in files:
+            display.add_task(str(file_path), file_path.name)
+        
         # 启动显示
         display.start()
         
         try:
-            # 处理每个文件
-            for file_path in files:
-                # 添加任务
-                task_id = str(file_path)
-                display.add_task(task_id, file_path.name)
-                display.set_current_task(task_id)
-                
-                try:
-                    # 读取文件
-                    content = yaml_handler.read_file(file_path)
-                    
-                    # 分块处理
-                    chunks = chunk_manager.split_content(content)
-                    
-                    # 翻译每个块
-                    translated_chunks = []
-                    for i, chunk in enumerate(chunks):
-                        # 更新进度
-                        progress = (i + 1) / len(chunks)
-                        display.update_task(
-                            task_id,
-                            status=f"翻译中 ({i + 1}/{len(chunks)})",
-                            progress=progress,
-                        )
-                        
-                        # 准备提示词
-                        prompt = prompt_manager.render_template(
-                            "default",
-                            {
-                                "text": chunk,
-                                "context": chunk_manager.get_context(i),
-                            },
-                        )
-                        
-                        # 翻译
-                        result = translator.translate(prompt)
-                        translated_chunks.append(result)
-                    
-                    # 合并结果
-                    final_content = chunk_manager.merge_chunks(translated_chunks)
-                    
-                    # 保存文件
-                    yaml_handler.write_file(file_path, final_content)
-                    
-                    # 更新任务状态
-                    display.update_task(
-                        task_id,
-                        status="已完成",
-                        progress=1.0,
-                    )
-                    
-                except Exception as e:
-                    log.error(f"处理文件 {file_path} 时出错: {str(e)}")
-                    display.update_task(
-                        task_id,
-                        status="失败",
-                        error=str(e),
+            if cpu_pool:
+                # 分块和YAML解析是CPU密集型的，多进程可以绕过GIL
+                _translate_in_pool(files, config, retry_handler, display)
+            else:
+                asyncio.run(
+                    _translate_async(
+                        files,
+                        config,
+                        yaml_handler,
+                        prompt_manager,
+                        translator,
+                        retry_handler,
+                        display,
                     )
-                    
-                    # 尝试重试
-                    should_retry, wait_time = retry_handler.should_retry(task_id, e)
-                    if should_retry:
-                        display.update_task(
-                            task_id,
-                            status=f"等待重试 ({int(wait_time)}s)",
-                        )
-                        # TODO: 实现重试逻辑
+                )
         
         finally:
             # 停止显示
@@ -218,6 +251,462 @@ def translate(
         ctx.exit(1)
 
 
+async def _translate_async(
+    files: List[Path],
+    config: "ConfigManager",
+    yaml_handler: "YAMLHandler",
+    prompt_manager: "PromptManager",
+    translator: "Translator",
+    retry_handler: "RetryHandler",
+    display: "DisplayManager",
+) -> None:
+    """并发翻译所有文件
+    
+    所有文件的块共享同一个信号量，同时进行的API请求数不超过
+    translation.max_concurrent。显示更新都在事件循环线程中执行，不需要加锁。
+    
+    Args:
+        files: 要处理的文件列表
+        config: 配置管理器
+        yaml_handler: YAML处理器
+        prompt_manager: 提示词管理器
+        translator: 翻译器
+        retry_handler: 重试处理器
+        display: 显示管理器
+    """
+    semaphore = asyncio.Semaphore(config.translation.max_concurrent)
+    
+    async def run(file_path: Path) -> None:
+        task_id = str(file_path)
+        try:
+            await _process_file(
+                file_path,
+                config,
+                yaml_handler,
+                prompt_manager,
+                translator,
+                display,
+                semaphore,
+            )
+            
+            # 更新任务状态
+            display.update_task(
+                task_id,
+                status="已完成",
+                progress=1.0,
+            )
+            
+        except Exception as e:
+            log.error(f"处理文件 {file_path} 时出错: {str(e)}")
+            display.update_task(
+                task_id,
+                status="失败",
+                error=str(e),
+            )
+            
+            # 临时错误已在块级别重试过，这里只记录失败状态
+            retry_handler.should_retry(task_id, e)
+    
+    try:
+        await asyncio.gather(*(run(file_path) for file_path in files))
+    finally:
+        await translator.close()
+
+
+def _make_retrying(retry_config: "RetryConfig") -> "AsyncRetrying":
+    """创建单个块的API请求重试策略
+    
+    只重试超时、连接错误和速率限制这类临时错误，等待时间按指数增长并加入随机抖动，
+    避免并发请求在同一时刻一起重试。
+    
+    Args:
+        retry_config: 重试配置
+        
+    Returns:
+        AsyncRetrying: 重试策略，每个块使用它的副本
+    """
+    from tenacity import (
+        AsyncRetrying,
+        retry_if_exception,
+        stop_after_attempt,
+        wait_exponential,
+        wait_exponential_jitter,
+    )
+    
+    from .utils import NetworkError, RateLimitError
+    from .utils import TimeoutError as RequestTimeoutError
+    
+    transient: List[Type[BaseException]] = [RateLimitError]
+    if retry_config.retry_on_timeout:
+        transient.extend([RequestTimeoutError, TimeoutError])
+    if retry_config.retry_on_connection_error:
+        transient.extend([NetworkError, ConnectionError])
+    transient_types = tuple(transient)
+    
+    def is_transient(error: BaseException) -> bool:
+        # 翻译器会把底层错误包装为TranslationError，沿异常链查找原因
+        while error is not None:
+            if isinstance(error, transient_types):
+                return True
+            error = error.__cause__
+        return False
+    
+    if retry_config.jitter:
+        wait = wait_exponential_jitter(
+            initial=retry_config.initial_delay,
+            max=retry_config.max_delay,
+            exp_base=retry_config.backoff_factor,
+        )
+    else:
+        wait = wait_exponential(
+            multiplier=retry_config.initial_delay,
+            max=retry_config.max_delay,
+            exp_base=retry_config.backoff_factor,
+        )
+    
+    return AsyncRetrying(
+        stop=stop_after_attempt(retry_config.max_retries + 1),
+        wait=wait,
+        retry=retry_if_exception(is_transient),
+        reraise=True,
+    )
+
+
+async def _translate_chunk_with_retry(
+    translator: "Translator",
+    retrying: "AsyncRetrying",
+    semaphore: asyncio.Semaphore,
+    text: str,
+    prompt: str,
+) -> str:
+    """翻译单个块，失败时只重试该块
+    
+    等待重试期间不占用信号量，其他块的请求可以继续进行。
+    
+    Args:
+        translator: 翻译器
+        retrying: 重试策略
+        semaphore: 并发请求信号量
+        text: 要翻译的文本
+        prompt: 翻译提示词
+        
+    Returns:
+        str: 翻译后的文本
+    """
+    async for attempt in retrying.copy():
+        with attempt:
+            async with semaphore:
+                response = await translator.translate(text, prompt)
+    return response.translated_text
+
+
+async def _process_file(
+    file_path: Path,
+    config: "Config",
+    yaml_handler: "YAMLHandler",
+    prompt_manager: "PromptManager",
+    translator: "Translator",
+    display: Optional["DisplayManager"],
+    semaphore: asyncio.Semaphore,
+) -> None:
+    """翻译单个文件
+    
+    Args:
+        file_path: 文件路径
+        config: 配置
+        yaml_handler: YAML处理器
+        prompt_manager: 提示词管理器
+        translator: 翻译器
+        display: 显示管理器，在子进程中为None
+        semaphore: 并发请求信号量
+    """
+    from .core import ChunkManager
+    
+    # 大文件边读边分块，不一次性加载全部内容
+    if file_path.stat().st_size > config.chunk.stream_threshold:
+        await _process_file_streaming(
+            file_path,
+            config,
+            yaml_handler,
+            prompt_manager,
+            translator,
+            display,
+            semaphore,
+        )
+        return
+    
+    task_id = str(file_path)
+    
+    # 分块管理器会缓存分块状态，每个文件使用独立实例
+    chunk_manager = ChunkManager(config.chunk, config.translation.chunk_size)
+    
+    # 读取文件
+    content = await yaml_handler.aread_file(file_path)
+    
+    # 分块处理
+    chunks = chunk_manager.split_content(content)
+    total = len(chunks)
+    completed = 0
+    
+    # 模板和重试策略只创建一次
+    render = prompt_manager.compile("default")
+    retrying = _make_retrying(config.retry)
+    
+    async def translate_chunk(index: int) -> str:
+        nonlocal completed
+        
+        # 准备提示词
+        prompt = render(
+            {
+                "text": chunks[index],
+                "context": chunk_manager.get_context(index),
+            }
+        )
+        
+        # 翻译
+        translated = await _translate_chunk_with_retry(
+            translator, retrying, semaphore, chunks[index], prompt
+        )
+        
+        # 更新进度
+        completed += 1
+        if display:
+            display.update_task(
+                task_id,
+                status=f"翻译中 ({completed}/{total})",
+                progress=completed / total,
+            )
+        
+        return translated
+    
+    if display:
+        display.set_current_task(task_id)
+    
+    # 并发翻译每个块，gather按原顺序返回结果
+    translated_chunks = await asyncio.gather(
+        *(translate_chunk(i) for i in range(total))
+    )
+    
+    # 合并结果
+    final_content = chunk_manager.merge_chunks(translated_chunks)
+    
+    # 保存文件
+    await yaml_handler.awrite_file(file_path, final_content)
+
+
+async def _process_file_streaming(
+    file_path: Path,
+    config: "Config",
+    yaml_handler: "YAMLHandler",
+    prompt_manager: "PromptManager",
+    translator: "Translator",
+    display: Optional["DisplayManager"],
+    semaphore: asyncio.Semaphore,
+) -> None:
+    """流式翻译大文件
+    
+    每读出一个块就立即提交翻译，读取文件与API请求重叠进行。同时在途的块数有上限，
+    译文按顺序逐块写出，内存中只保留在途的块。
+    
+    Args:
+        file_path: 文件路径
+        config: 配置
+        yaml_handler: YAML处理器
+        prompt_manager: 提示词管理器
+        translator: 翻译器
+        display: 显示管理器，在子进程中为None
+        semaphore: 并发请求信号量
+    """
+    task_id = str(file_path)
+    context_lines = config.chunk.context_lines
+    
+    # 同时在途的块数上限：足够让请求并发进行，内存占用只与块大小有关而与文件大小无关
+    window = max(1, config.translation.max_concurrent) * 2
+    pending: Deque[Tuple[str, "asyncio.Task[str]"]] = collections.deque()
+    submitted = 0
+    completed = 0
+    read_done = False
+    
+    # 模板和重试策略只创建一次
+    render = prompt_manager.compile("default")
+    retrying = _make_retrying(config.retry)
+    
+    async def translate_chunk(chunk: str, context: Optional[str]) -> str:
+        nonlocal completed
+        
+        # 准备提示词
+        prompt = render(
+            {
+                "text": chunk,
+                "context": context,
+            }
+        )
+        
+        # 翻译
+        translated = await _translate_chunk_with_retry(
+            translator, retrying, semaphore, chunk, prompt
+        )
+        
+        # 更新进度（读完文件前总块数未知，只报告已完成的块数）
+        completed += 1
+        if display:
+            if read_done:
+                display.update_task(
+                    task_id,
+                    status=f"翻译中 ({completed}/{submitted})",
+                    progress=completed / submitted,
+                )
+            else:
+                display.update_task(task_id, status=f"翻译中 (已完成{completed}块)")
+        
+        return translated
+    
+    async def next_result() -> str:
+        # 按原顺序取出最早提交的块的译文，并恢复原文块末尾的换行
+        chunk, task = pending.popleft()
+        return _keep_line_ending(chunk, await task)
+    
+    async def translated_chunks() -> AsyncIterator[str]:
+        nonlocal submitted, read_done
+        
+        previous: Optional[str] = None
+        async for chunk in yaml_handler.aiter_chunks(file_path, config.chunk.max_chunk_size):
+            # 使用上一块的末尾几行作为上下文
+            context = None
+            if previous is not None and context_lines > 0:
+                context = "\n".join(previous.splitlines()[-context_lines:])
+            
+            pending.append((chunk, asyncio.create_task(translate_chunk(chunk, context))))
+            submitted += 1
+            previous = chunk
+            
+            # 在途块达到上限时先写出最早的块，再继续读取
+            while len(pending) >= window:
+                yield await next_result()
+        
+        read_done = True
+        while pending:
+            yield await next_result()
+    
+    if display:
+        display.set_current_task(task_id)
+    
+    # 译文按顺序逐块写入文件
+    try:
+        await yaml_handler.awrite_chunks(file_path, translated_chunks())
+    finally:
+        # 出错时取消还在进行的翻译
+        for _, task in pending:
+            task.cancel()
+
+
+def _keep_line_ending(source: str, translated: str) -> str:
+    """使译文块的末尾换行与原文块一致
+    
+    模型返回的译文通常会去掉末尾的换行，直接拼接会使相邻两块首尾相连。
+    
+    Args:
+        source: 原文块
+        translated: 译文块
+        
+    Returns:
+        str: 去掉末尾换行后接上原文块末尾换行的译文
+    """
+    content = source.rstrip("\r\n")
+    return translated.rstrip("\r\n") + source[len(content):]
+
+
+def _translate_in_pool(
+    files: List[Path],
+    config: "ConfigManager",
+    retry_handler: "RetryHandler",
+    display: "DisplayManager",
+) -> None:
+    """使用进程池翻译所有文件
+    
+    子进程只接收文件路径和配置字典，各自创建处理组件，显示只在主进程中更新。
+    
+    Args:
+        files: 要处理的文件列表
+        config: 配置管理器
+        retry_handler: 重试处理器
+        display: 显示管理器
+    """
+    from .utils import TranslationError
+    
+    # ConfigManager本身不能序列化，传给子进程的是它加载的Config
+    config_data = config.config.model_dump()
+    jobs = [(str(file_path), config_data) for file_path in files]
+    
+    with multiprocessing.Pool(config.config.translation.max_concurrent) as pool:
+        for task_id, error in pool.imap_unordered(_process_file_in_worker, jobs):
+            if error is None:
+                display.update_task(
+                    task_id,
+                    status="已完成",
+                    progress=1.0,
+                )
+                continue
+            
+            log.error(f"处理文件 {task_id} 时出错: {error}")
+            display.update_task(
+                task_id,
+                status="失败",
+                error=error,
+            )
+            
+            # 临时错误已在子进程的块级别重试过，这里只记录失败状态
+            retry_handler.should_retry(task_id, TranslationError(error))
+
+
+def _process_file_in_worker(job: Tuple[str, Dict[str, Any]]) -> Tuple[str, Optional[str]]:
+    """在子进程中翻译单个文件
+    
+    Args:
+        job: (文件路径, 配置字典)
+        
+    Returns:
+        Tuple[str, Optional[str]]: (文件路径, 错误信息)，成功时错误信息为None
+    """
+    from .config import Config
+    from .core import PromptManager, Translator, YAMLHandler
+    
+    file_path, config_data = job
+    
+    try:
+        config = Config.model_validate(config_data)
+        yaml_handler = YAMLHandler(config.yaml)
+        prompt_manager = PromptManager(config.prompts)
+        translator = Translator(
+            config.api,
+            config.translation,
+            config.blacklist,
+            cache_config=config.cache,
+        )
+        
+        async def run() -> None:
+            semaphore = asyncio.Semaphore(config.translation.max_concurrent)
+            try:
+                await _process_file(
+                    Path(file_path),
+                    config,
+                    yaml_handler,
+                    prompt_manager,
+                    translator,
+                    None,
+                    semaphore,
+                )
+            finally:
+                await translator.close()
+        
+        asyncio.run(run())
+        return file_path, None
+        
+    except Exception as e:
+        # 自定义异常不一定能被pickle，只把错误信息传回主进程
+        return file_path, str(e)
+
+
 @cli.command()
 @click.option(
     "-o",
@@ -262,13 +751,15 @@ def add_template(ctx: click.Context, template_name: str, file: str) -> None:
     TEMPLATE_NAME: 模板名称
     FILE: 模板文件路径（JSON格式）
     """
+    from .core import PromptManager
+    from .utils import loads_json
+    
     try:
         config = ctx.obj["config"]
-        prompt_manager = PromptManager(config.prompt)
+        prompt_manager = _get_manager(ctx, PromptManager, "prompt")
         
         # 读取模板文件
-        with open(file, "r", encoding="utf-8") as f:
-            template_data = json.load(f)
+        template_data = loads_json(Path(file).read_bytes())
         
         # 添加模板
         template = PromptTemplate(name=template_name, **template_data)
@@ -285,9 +776,11 @@ def add_template(ctx: click.Context, template_name: str, file: str) -> None:
 @click.pass_context
 def list_templates(ctx: click.Context) -> None:
     """列出所有提示词模板"""
+    from .core import PromptManager
+    
     try:
         config = ctx.obj["config"]
-        prompt_manager = PromptManager(config.prompt)
+        prompt_manager = _get_manager(ctx, PromptManager, "prompt")
         
         # 获取所有模板
         templates = prompt_manager.list_templates()
@@ -330,9 +823,11 @@ def create(ctx: click.Context, file: str) -> None:
     
     FILE: 要备份的文件路径
     """
+    from .core import BackupManager
+    
     try:
         config = ctx.obj["config"]
-        backup_manager = BackupManager(config.backup)
+        backup_manager = _get_manager(ctx, BackupManager, "backup")
         
         # 创建备份
         backup_path = backup_manager.backup_file(file)
@@ -361,9 +856,11 @@ def restore(ctx: click.Context, file: str, index: int) -> None:
     
     FILE: 要恢复的文件路径
     """
+    from .core import BackupManager
+    
     try:
         config = ctx.obj["config"]
-        backup_manager = BackupManager(config.backup)
+        backup_manager = _get_manager(ctx, BackupManager, "backup")
         
         # 恢复文件
         backup_manager.restore_file(file, index)
@@ -379,15 +876,26 @@ def restore(ctx: click.Context, file: str, index: int) -> None:
     "file",
     type=click.Path(exists=True, dir_okay=False),
 )
+@click.option(
+    "-n",
+    "--limit",
+    type=int,
+    default=50,
+    help="最多显示的备份数量（显示最新的备份），0表示全部显示",
+)
 @click.pass_context
-def list(ctx: click.Context, file: str) -> None:
+def list(ctx: click.Context, file: str, limit: int) -> None:
     """列出文件的所有备份
     
     FILE: 文件路径
     """
+    from rich.table import Table
+    
+    from .core import BackupManager
+    
     try:
         config = ctx.obj["config"]
-        backup_manager = BackupManager(config.backup)
+        backup_manager = _get_manager(ctx, BackupManager, "backup")
         
         # 获取备份列表
         backups = backup_manager.list_backups(file)
@@ -396,11 +904,28 @@ def list(ctx: click.Context, file: str) -> None:
             console.print(f"[yellow]文件 {file} 没有备份[/]")
             return
         
+        # 备份过多时只显示最新的部分，索引保持不变
+        start = max(0, len(backups) - limit) if limit > 0 else 0
+        if start:
+            console.print(f"[yellow]共 {len(backups)} 个备份，仅显示最新的 {limit} 个[/]")
+        
+        # 预先生成所有行
+        rows = [
+            (
+                str(i),
+                Path(backup["path"]).name,
+                backup["timestamp"],
+                _format_size(backup["size"]),
+            )
+            for i, backup in enumerate(backups[start:], start)
+        ]
+        
         # 创建表格
         table = Table(
             show_header=True,
             header_style="bold magenta",
             border_style="blue",
+            expand=False,
         )
         table.add_column("索引", style="cyan", justify="right")
         table.add_column("备份文件", style="green")
@@ -408,21 +933,8 @@ def list(ctx: click.Context, file: str) -> None:
         table.add_column("大小", justify="right")
         
         # 添加备份信息
-        for i, backup in enumerate(backups):
-            size = backup["size"]
-            if size < 1024:
-                size_str = f"{size}B"
-            elif size < 1024 * 1024:
-                size_str = f"{size/1024:.1f}KB"
-            else:
-                size_str = f"{size/1024/1024:.1f}MB"
-            
-            table.add_row(
-                str(i),
-                Path(backup["path"]).name,
-                backup["timestamp"],
-                size_str,
-            )
+        for row in rows:
+            table.add_row(*row)
         
         console.print(table)
         
@@ -431,6 +943,22 @@ def list(ctx: click.Context, file: str) -> None:
         ctx.exit(1)
 
 
+def _format_size(size: int) -> str:
+    """格式化文件大小
+    
+    Args:
+        size: 字节数
+        
+    Returns:
+        str: 带单位的大小字符串
+    """
+    if size < 1024:
+        return f"{size}B"
+    if size < 1024 * 1024:
+        return f"{size/1024:.1f}KB"
+    return f"{size/1024/1024:.1f}MB"
+
+
 @backup.command()
 @click.argument(
     "file",
@@ -443,9 +971,11 @@ def cleanup(ctx: click.Context, file: Optional[str]) -> None:
     
     FILE: 要清理的文件路径，如果不指定则清理所有备份
     """
+    from .core import BackupManager
+    
     try:
         config = ctx.obj["config"]
-        backup_manager = BackupManager(config.backup)
+        backup_manager = _get_manager(ctx, BackupManager, "backup")
         
         # 清理备份
         backup_manager.cleanup(file)
@@ -473,9 +1003,11 @@ def add_word(ctx: click.Context, word: str) -> None:
     
     WORD: 要添加的词汇
     """
+    from .core import BlacklistManager
+    
     try:
         config = ctx.obj["config"]
-        blacklist_manager = BlacklistManager(config.blacklist)
+        blacklist_manager = _get_manager(ctx, BlacklistManager, "blacklist")
         
         # 添加词汇
         blacklist_manager.add_word(word)
@@ -498,9 +1030,11 @@ def add_pattern(ctx: click.Context, pattern: str) -> None:
     
     PATTERN: 正则表达式
     """
+    from .core import BlacklistManager
+    
     try:
         config = ctx.obj["config"]
-        blacklist_manager = BlacklistManager(config.blacklist)
+        blacklist_manager = _get_manager(ctx, BlacklistManager, "blacklist")
         
         # 添加正则
         blacklist_manager.add_pattern(pattern)
@@ -523,9 +1057,11 @@ def remove_word(ctx: click.Context, word: str) -> None:
     
     WORD: 要移除的词汇
     """
+    from .core import BlacklistManager
+    
     try:
         config = ctx.obj["config"]
-        blacklist_manager = BlacklistManager(config.blacklist)
+        blacklist_manager = _get_manager(ctx, BlacklistManager, "blacklist")
         
         # 移除词汇
         blacklist_manager.remove_word(word)
@@ -548,9 +1084,11 @@ def remove_pattern(ctx: click.Context, pattern: str) -> None:
     
     PATTERN: 正则表达式
     """
+    from .core import BlacklistManager
+    
     try:
         config = ctx.obj["config"]
-        blacklist_manager = BlacklistManager(config.blacklist)
+        blacklist_manager = _get_manager(ctx, BlacklistManager, "blacklist")
         
         # 移除正则
         blacklist_manager.remove_pattern(pattern)
@@ -569,9 +1107,13 @@ def remove_pattern(ctx: click.Context, pattern: str) -> None:
 @click.pass_context
 def list(ctx: click.Context) -> None:
     """列出所有黑名单内容"""
+    from rich.table import Table
+    
+    from .core import BlacklistManager
+    
     try:
         config = ctx.obj["config"]
-        blacklist_manager = BlacklistManager(config.blacklist)
+        blacklist_manager = _get_manager(ctx, BlacklistManager, "blacklist")
         
         # 创建表格
         table = Table(
@@ -582,13 +1124,13 @@ def list(ctx: click.Context) -> None:
         table.add_column("类型", style="cyan")
         table.add_column("内容", style="green")
         
-        # 添加词汇
-        for word in sorted(blacklist_manager._words):
+        # 添加词汇（已按顺序存储）
+        for word in blacklist_manager._words:
             table.add_row("词汇", word)
         
-        # 添加正则
-        for pattern in sorted(p.pattern for p in blacklist_manager._patterns):
-            table.add_row("正则", pattern)
+        # 添加正则（已按模式字符串顺序存储）
+        for pattern in blacklist_manager._patterns:
+            table.add_row("正则", pattern.pattern)
         
         # 显示配置信息
         console.print("\n黑名单配置:")
@@ -619,9 +1161,11 @@ def export(ctx: click.Context, file: str) -> None:
     
     FILE: 导出文件路径
     """
+    from .core import BlacklistManager
+    
     try:
         config = ctx.obj["config"]
-        blacklist_manager = BlacklistManager(config.blacklist)
+        blacklist_manager = _get_manager(ctx, BlacklistManager, "blacklist")
         
         # 导出黑名单
         blacklist_manager.export_blacklist(file)
@@ -643,9 +1187,11 @@ def load(ctx: click.Context, file: str) -> None:
     
     FILE: 黑名单文件路径
     """
+    from .core import BlacklistManager
+    
     try:
         config = ctx.obj["config"]
-        blacklist_manager = BlacklistManager(config.blacklist)
+        blacklist_manager = _get_manager(ctx, BlacklistManager, "blacklist")
         
         # 加载黑名单
         blacklist_manager.load_blacklist_file(file)
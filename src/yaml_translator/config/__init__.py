@@ -2,6 +2,7 @@ from .config_manager import (
     APIConfig,
     BackupConfig,
     BlacklistConfig,
+    CacheConfig,
     Config,
     ConfigManager,
     DisplayConfig,
@@ -20,6 +21,7 @@ __all__ = [
     "APIConfig",
     "BackupConfig",
     "BlacklistConfig",
+    "CacheConfig",
     "ChunkConfig",
     "Config",
     "ConfigManager",
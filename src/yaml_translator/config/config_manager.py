@@ -1,22 +1,39 @@
+import copy
+import functools
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, ClassVar, Dict, List, Optional, Tuple, Union
 
-from pydantic import BaseModel, Field, validator
-from ruamel.yaml import YAML
+import yaml as pyyaml
+from pydantic import Field, SkipValidation, ValidationError, field_validator
 
+from .models import ChunkConfig, FrozenModel
 
-class APIConfig(BaseModel):
-    """API配置模型"""
-    endpoint: str = Field(default="https://api.openai.com/v1")
-    key: str = Field(default="")
+try:
+    from yaml import CSafeDumper as SafeDumper
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # 未编译libyaml时回退到纯Python实现
+    from yaml import SafeDumper, SafeLoader
+
+# 缓存目录
+CACHE_DIR = Path.home() / ".cache" / "yaml_translator"
+
+
+class APIConfig(FrozenModel):
+    """API配置模型
+    
+    没有约束的字符串字段跳过验证，原样保存用户提供的值。
+    """
+    endpoint: SkipValidation[str] = Field(default="https://api.openai.com/v1")
+    key: SkipValidation[str] = Field(default="")
     model: str = Field(default="gpt-3.5-turbo")
     max_tokens: int = Field(default=4000)
     temperature: float = Field(default=0.7)
     timeout: int = Field(default=30)
     retry_count: int = Field(default=3)
+    rate_limit: int = Field(default=60, description="每分钟最大请求数")
 
 
-class BackupConfig(BaseModel):
+class BackupConfig(FrozenModel):
     """备份配置模型"""
     enabled: bool = Field(default=True, description="是否启用备份")
     backup_dir: str = Field(default=".backup", description="备份目录")
@@ -24,17 +41,18 @@ class BackupConfig(BaseModel):
     compress: bool = Field(default=True, description="是否压缩备份")
     auto_backup: bool = Field(default=True, description="是否自动备份")
     backup_interval: int = Field(default=3600, description="备份间隔（秒）")
+    auto_flush_interval: float = Field(default=30.0, description="备份信息自动保存间隔（秒），0表示只在退出时保存")
 
 
-class FileMatchingConfig(BaseModel):
+class FileMatchingConfig(FrozenModel):
     """文件匹配配置模型"""
-    include_patterns: List[str] = Field(default=["*.yml", "*.yaml"])
-    exclude_patterns: List[str] = Field(default=[".git/**", "node_modules/**", "venv/**"])
-    exclude_dirs: List[str] = Field(default=[".git", "node_modules", "venv", "__pycache__"])
+    include_patterns: List[str] = Field(default_factory=lambda: ["*.yml", "*.yaml"])
+    exclude_patterns: List[str] = Field(default_factory=lambda: [".git/**", "node_modules/**", "venv/**"])
+    exclude_dirs: List[str] = Field(default_factory=lambda: [".git", "node_modules", "venv", "__pycache__"])
     max_file_size: int = Field(default=10485760)  # 10MB
 
 
-class TranslationConfig(BaseModel):
+class TranslationConfig(FrozenModel):
     """翻译配置模型"""
     chunk_size: int = Field(default=2000)
     max_concurrent: int = Field(default=3)
@@ -42,27 +60,36 @@ class TranslationConfig(BaseModel):
     retry_delay: int = Field(default=5)
 
 
-class BlacklistConfig(BaseModel):
+class BlacklistConfig(FrozenModel):
     """黑名单配置模型"""
-    words: List[str] = Field(default=["API", "URL", "HTTP", "SDK", "ID"])
-    patterns: List[str] = Field(default=[r"\$\{.*?\}", r"\{\{.*?\}\}"])
+    words: List[str] = Field(default_factory=lambda: ["API", "URL", "HTTP", "SDK", "ID"])
+    patterns: List[str] = Field(default_factory=lambda: [r"\$\{.*?\}", r"\{\{.*?\}\}"])
     case_sensitive: bool = Field(default=False)
     preserve_case: bool = Field(default=True)
 
 
-class PromptTemplate(BaseModel):
+class PromptTemplate(FrozenModel):
     """提示词模板模型"""
     name: str
     content: str
 
 
-class PromptsConfig(BaseModel):
+# 默认提示词，与 default_config.yaml 中的 prompts.default 保持一致
+DEFAULT_PROMPT = (
+    "请将以下YAML内容翻译成中文，保持原有格式和结构不变：\n"
+    "{text}\n"
+    "注意事项： 1. 只翻译值，不要翻译键名 2. 保持原有的缩进和格式 "
+    "3. 不要翻译特殊标记（如变量、占位符等） 4. 保持原有的注释，但将注释内容翻译成中文\n"
+)
+
+
+class PromptsConfig(FrozenModel):
     """提示词配置模型"""
-    default: str
-    templates: List[PromptTemplate] = Field(default=[])
+    default: str = Field(default=DEFAULT_PROMPT)
+    templates: List[PromptTemplate] = Field(default_factory=list)
 
 
-class ProgressConfig(BaseModel):
+class ProgressConfig(FrozenModel):
     """进度配置模型"""
     save_interval: int = Field(default=30)
     save_path: str = Field(default=".progress")
@@ -72,15 +99,16 @@ class ProgressConfig(BaseModel):
     backup_suffix: str = Field(default=".bak")
 
 
-class LoggingConfig(BaseModel):
+class LoggingConfig(FrozenModel):
     """日志配置模型"""
     level: str = Field(default="INFO")
-    format: str = Field(default="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    format: SkipValidation[str] = Field(default="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
     file: str = Field(default="yaml_translator.log")
     max_size: int = Field(default=10485760)
     backup_count: int = Field(default=5)
 
-    @validator("level")
+    @field_validator("level")
+    @classmethod
     def validate_level(cls, v: str) -> str:
         """验证日志级别"""
         valid_levels = ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
@@ -89,18 +117,19 @@ class LoggingConfig(BaseModel):
         return v.upper()
 
 
-class DisplayConfig(BaseModel):
+class DisplayConfig(FrozenModel):
     """显示配置模型"""
     show_progress: bool = Field(default=True, description="是否显示进度条")
     show_status: bool = Field(default=True, description="是否显示状态信息")
     show_errors: bool = Field(default=True, description="是否显示错误信息")
     refresh_rate: float = Field(default=0.1, description="刷新率（秒）")
+    fancy_table: bool = Field(default=True, description="是否使用自动排版的任务表格，任务很多时可关闭以降低刷新开销")
     use_colors: bool = Field(default=True, description="是否使用彩色输出")
     status_format: str = Field(default="[{task}] {status}", description="状态格式")
     error_format: str = Field(default="[red]错误: {error}[/]", description="错误格式")
 
 
-class RetryConfig(BaseModel):
+class RetryConfig(FrozenModel):
     """重试配置模型"""
     max_retries: int = Field(default=3, description="最大重试次数")
     initial_delay: float = Field(default=1.0, description="初始延迟时间（秒）")
@@ -111,7 +140,7 @@ class RetryConfig(BaseModel):
     retry_on_connection_error: bool = Field(default=True, description="是否在连接错误时重试")
 
 
-class YAMLConfig(BaseModel):
+class YAMLConfig(FrozenModel):
     """YAML配置模型"""
     preserve_quotes: bool = Field(default=True, description="是否保留引号")
     preserve_comments: bool = Field(default=True, description="是否保留注释")
@@ -121,7 +150,15 @@ class YAMLConfig(BaseModel):
     default_flow_style: bool = Field(default=False, description="是否使用流式风格")
 
 
-class Config(BaseModel):
+class CacheConfig(FrozenModel):
+    """翻译缓存配置模型"""
+    enabled: bool = Field(default=True, description="是否启用翻译缓存")
+    max_entries: int = Field(default=10000, description="内存中最多缓存的翻译条数")
+    persist: bool = Field(default=True, description="是否将缓存持久化到磁盘")
+    path: str = Field(default=str(CACHE_DIR / "translations.sqlite"), description="缓存数据库路径")
+
+
+class Config(FrozenModel):
     """主配置模型"""
     api: APIConfig = Field(default_factory=APIConfig)
     backup: BackupConfig = Field(default_factory=BackupConfig)
@@ -129,35 +166,67 @@ class Config(BaseModel):
     file_matching: FileMatchingConfig = Field(default_factory=FileMatchingConfig)
     retry: RetryConfig = Field(default_factory=RetryConfig)
     translation: TranslationConfig = Field(default_factory=TranslationConfig)
+    chunk: ChunkConfig = Field(default_factory=ChunkConfig)
     blacklist: BlacklistConfig = Field(default_factory=BlacklistConfig)
-    prompts: PromptsConfig
+    prompts: PromptsConfig = Field(default_factory=PromptsConfig)
     progress: ProgressConfig = Field(default_factory=ProgressConfig)
     logging: LoggingConfig = Field(default_factory=LoggingConfig)
     yaml: YAMLConfig = Field(default_factory=YAMLConfig)
+    cache: CacheConfig = Field(default_factory=CacheConfig)
 
 
 class ConfigManager:
     """配置管理器"""
+
+    # 进程内共享的配置对象，键为配置文件及其修改时间
+    _INSTANCES: ClassVar[Dict[Tuple, Config]] = {}
+
     def __init__(self, config_path: Optional[Union[str, Path]] = None):
-        self._config: Optional[Config] = None
         self._config_path = Path(config_path) if config_path else None
         self._default_config_path = Path(__file__).parent / "default_config.yaml"
+        self._config: Optional[Config] = ConfigManager._INSTANCES.get(self._instance_key())
+
+    @classmethod
+    def invalidate(cls) -> None:
+        """清除进程内的配置缓存"""
+        cls._INSTANCES.clear()
+        cls._parse_yaml.cache_clear()
+
+    def _instance_key(self) -> Tuple:
+        """计算共享配置对象的缓存键"""
+        key: List[Any] = []
+        for path in (self._default_config_path, self._config_path):
+            if path is not None and path.exists():
+                stat = path.stat()
+                key.append((str(path.resolve()), stat.st_mtime_ns, stat.st_size))
+            else:
+                key.append(None)
+        return tuple(key)
 
     def load(self) -> Config:
         """加载配置"""
         try:
-            # 首先加载默认配置
-            default_config = self._load_yaml(self._default_config_path)
+            instance_key = self._instance_key()
+            cached = ConfigManager._INSTANCES.get(instance_key)
+            if cached is not None:
+                self._config = cached
+                return self._config
             
-            # 如果指定了自定义配置，则合并配置
             if self._config_path and self._config_path.exists():
+                # 合并默认配置和自定义配置
+                default_config = self._load_yaml(self._default_config_path)
                 user_config = self._load_yaml(self._config_path)
                 merged_config = self._merge_configs(default_config, user_config)
+                self._config = Config.model_validate(merged_config)
             else:
-                merged_config = default_config
-
-            # 创建配置对象
-            self._config = Config(**merged_config)
+                # 没有自定义配置时，模型默认值与默认配置文件一致，无需解析
+                try:
+                    self._config = Config()
+                except ValidationError:
+                    default_config = self._load_yaml(self._default_config_path)
+                    self._config = Config.model_validate(default_config)
+
+            ConfigManager._INSTANCES[instance_key] = self._config
             return self._config
         except Exception as e:
             raise ValueError(f"Failed to load config: {str(e)}")
@@ -171,28 +240,46 @@ class ConfigManager:
 
     @staticmethod
     def _load_yaml(path: Path) -> Dict[str, Any]:
-        """加载YAML文件"""
+        """加载YAML文件
+        
+        解析结果按 (路径, 修改时间, 大小) 缓存在进程内，文件未变化时直接返回缓存。
+        返回的字典是共享的，调用方不应修改。
+        """
         try:
-            yaml = YAML(typ="safe")
-            yaml.allow_unicode = True
-            yaml.default_flow_style = False
-            yaml.sort_keys = False
-            yaml.indent(mapping=2, sequence=4, offset=2)
-            
-            with path.open("r", encoding="utf-8") as f:
-                return yaml.load(f)
+            stat = path.stat()
+            return ConfigManager._parse_yaml(
+                str(path.resolve()), stat.st_mtime_ns, stat.st_size
+            )
+        except Exception as e:
+            raise ValueError(f"Failed to load config file {path}: {str(e)}")
+
+    @staticmethod
+    @functools.lru_cache(maxsize=8)
+    def _parse_yaml(path_str: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+        """解析YAML文件（按路径和修改时间缓存）"""
+        path = Path(path_str)
+        try:
+            # 只读解析不需要ruamel的往返格式保留，使用libyaml加速的PyYAML
+            # 直接传入字节，由libyaml识别编码，省去Python层的解码
+            return pyyaml.load(path.read_bytes(), Loader=SafeLoader)
         except Exception as e:
             raise ValueError(f"Failed to load config file {path}: {str(e)}")
 
     @staticmethod
     def _merge_configs(default: Dict[str, Any], user: Dict[str, Any]) -> Dict[str, Any]:
-        """递归合并配置"""
-        result = default.copy()
-        for key, value in user.items():
-            if key in result and isinstance(result[key], dict) and isinstance(value, dict):
-                result[key] = ConfigManager._merge_configs(result[key], value)
-            else:
-                result[key] = value
+        """合并配置
+        
+        只在开始时深拷贝一次默认配置，之后用工作栈原地合并，不修改传入的字典。
+        """
+        result = copy.deepcopy(default)
+        stack = [(result, user)]
+        while stack:
+            target, source = stack.pop()
+            for key, value in source.items():
+                if isinstance(value, dict) and isinstance(target.get(key), dict):
+                    stack.append((target[key], value))
+                else:
+                    target[key] = value
         return result
 
     def save(self, path: Optional[Union[str, Path]] = None) -> None:
@@ -209,26 +296,48 @@ class ConfigManager:
             save_path.parent.mkdir(parents=True, exist_ok=True)
 
             # 保存配置
-            yaml = YAML()
-            yaml.allow_unicode = True
-            yaml.default_flow_style = False
-            yaml.sort_keys = False
-            yaml.indent(mapping=2, sequence=4, offset=2)
-            
-            with save_path.open("w", encoding="utf-8") as f:
-                yaml.dump(self._config.dict(), f)
+            self._dump_yaml(self._config, save_path)
         except Exception as e:
             raise ValueError(f"Failed to save config file {path}: {str(e)}")
 
+    @staticmethod
+    def _dump_yaml(config: Config, path: Path) -> None:
+        """将配置写入YAML文件
+        
+        导出的配置不需要保留注释，直接用libyaml加速的PyYAML序列化。
+        
+        Args:
+            config: 配置对象
+            path: 文件路径
+        """
+        content = pyyaml.dump(
+            config.model_dump(mode="json"),
+            Dumper=SafeDumper,
+            allow_unicode=True,
+            default_flow_style=False,
+            sort_keys=False,
+            indent=2,
+        )
+        path.write_text(content, encoding="utf-8")
+
     def update(self, config_dict: Dict[str, Any]) -> None:
         """更新配置"""
         try:
             if self._config is None:
                 self.load()
             
-            # 合并新的配置
-            merged = self._merge_configs(self._config.dict(), config_dict)
-            self._config = Config(**merged)
+            # 只重新验证有变化的子配置，其余子配置对象原样复用
+            changes: Dict[str, Any] = {}
+            for key, value in config_dict.items():
+                if key not in Config.model_fields:
+                    continue
+                current = getattr(self._config, key)
+                if isinstance(value, dict):
+                    value = self._merge_configs(current.model_dump(), value)
+                changes[key] = type(current).model_validate(value)
+            
+            if changes:
+                self._config = self._config.model_copy(update=changes)
         except Exception as e:
             raise ValueError(f"Failed to update config: {str(e)}")
 
@@ -257,13 +366,6 @@ class ConfigManager:
             save_path.parent.mkdir(parents=True, exist_ok=True)
             
             # 导出配置
-            yaml = YAML()
-            yaml.allow_unicode = True
-            yaml.default_flow_style = False
-            yaml.sort_keys = False
-            yaml.indent(mapping=2, sequence=4, offset=2)
-            
-            with save_path.open("w", encoding="utf-8") as f:
-                yaml.dump(self._config.dict(), f)
+            self._dump_yaml(self._config, save_path)
         except Exception as e:
             raise ValueError(f"Failed to export config file {path}: {str(e)}") 
\ No newline at end of file
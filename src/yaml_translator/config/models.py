@@ -3,10 +3,19 @@
 """
 from typing import List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
-class ChunkConfig(BaseModel):
+class FrozenModel(BaseModel):
+    """只读配置模型基类
+    
+    配置加载后不再修改，冻结后可以在多个管理器之间安全共享。
+    未知字段直接忽略，旧版本的配置文件也能加载。
+    """
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
+
+class ChunkConfig(FrozenModel):
     """分块配置"""
     max_chunk_size: int = Field(
         default=4000,
@@ -17,7 +26,7 @@ class ChunkConfig(BaseModel):
         description="每个块的最小字符数",
     )
     split_keywords: List[str] = Field(
-        default=["---", "===", "###"],
+        default_factory=lambda: ["---", "===", "###"],
         description="触发分块的关键字",
     )
     context_lines: int = Field(
@@ -28,9 +37,13 @@ class ChunkConfig(BaseModel):
         default=0.8,
         description="块合并阈值",
     )
+    stream_threshold: int = Field(
+        default=1048576,  # 1MB
+        description="超过该字节数的文件边读取边分块",
+    )
 
 
-class RetryConfig(BaseModel):
+class RetryConfig(FrozenModel):
     """重试配置"""
     max_network_retries: int = Field(
         default=3,
@@ -74,7 +87,7 @@ class RetryConfig(BaseModel):
     )
 
 
-class RecoveryConfig(BaseModel):
+class RecoveryConfig(FrozenModel):
     """恢复配置"""
     save_path: str = Field(
         default=".progress",
@@ -96,9 +109,13 @@ class RecoveryConfig(BaseModel):
         default=True,
         description="是否保留失败任务",
     )
+    debug_dump_json: bool = Field(
+        default=False,
+        description="是否以可读的JSON格式保存检查点（默认安装了msgpack时使用MessagePack）",
+    )
 
 
-class ErrorConfig(BaseModel):
+class ErrorConfig(FrozenModel):
     """错误处理配置"""
     exit_on_fatal: bool = Field(
         default=True,
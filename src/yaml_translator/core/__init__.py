@@ -1,12 +1,45 @@
-from .backup_manager import BackupManager
-from .blacklist_manager import BlacklistManager
-from .chunk_manager import ChunkManager
-from .display_manager import DisplayManager
-from .file_matcher import FileMatcher
-from .prompt_manager import PromptManager
-from .retry_handler import RetryHandler
-from .translator import Translator
-from .yaml_handler import YAMLHandler
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .backup_manager import BackupManager
+    from .blacklist_manager import BlacklistManager
+    from .chunk_manager import ChunkManager
+    from .display_manager import DisplayManager
+    from .file_matcher import FileMatcher
+    from .prompt_manager import PromptManager
+    from .retry_handler import RetryHandler
+    from .translation_cache import TranslationCache
+    from .translator import Translator
+    from .yaml_handler import YAMLHandler
+
+# 子模块在首次访问对应类时才导入，只用到部分组件的命令不必加载整个翻译栈
+_LAZY = {
+    "BackupManager": ".backup_manager",
+    "BlacklistManager": ".blacklist_manager",
+    "ChunkManager": ".chunk_manager",
+    "DisplayManager": ".display_manager",
+    "FileMatcher": ".file_matcher",
+    "PromptManager": ".prompt_manager",
+    "RetryHandler": ".retry_handler",
+    "TranslationCache": ".translation_cache",
+    "Translator": ".translator",
+    "YAMLHandler": ".yaml_handler",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY:
+        module = importlib.import_module(_LAZY[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
+
 
 __all__ = [
     "BackupManager",
@@ -16,6 +49,7 @@ __all__ = [
     "FileMatcher",
     "PromptManager",
     "RetryHandler",
+    "TranslationCache",
     "Translator",
     "YAMLHandler",
-] 
\ No newline at end of file
+]
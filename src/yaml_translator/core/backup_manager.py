@@ -1,18 +1,29 @@
 """
 备份管理模块
 """
-import json
+import atexit
+import hashlib
+import os
 import shutil
+import tempfile
+import time
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Set, Union
 
 from ..config import BackupConfig
-from ..utils import BackupError, log
+from ..utils import BackupError, dumps_json, loads_json, log
 
 
 class BackupManager:
-    """备份管理器"""
+    """备份管理器
+    
+    每个文件的备份记录按创建时间从旧到新排列：新备份追加在末尾，
+    清理时从开头删除，因此无需再排序，索引-1始终是最新的备份。
+    
+    备份信息按原文件路径的哈希前缀分片保存在 backup_info/ 目录下，修改后只标记对应分片
+    为待保存，按 auto_flush_interval 间隔或在进程退出时只重写有变化的分片。
+    """
 
     def __init__(self, config: BackupConfig):
         """初始化备份管理器
@@ -22,14 +33,20 @@ class BackupManager:
         """
         self.config = config
         self._backup_dir = Path(config.backup_dir)
-        self._backup_info_file = self._backup_dir / "backup_info.json"
+        self._info_dir = self._backup_dir / "backup_info"
+        self._legacy_info_file = self._backup_dir / "backup_info.json"
         self._backup_info: Dict[str, List[Dict]] = {}
+        self._dirty_shards: Set[str] = set()
+        self._last_flush = time.monotonic()
         
         # 创建备份目录
-        self._backup_dir.mkdir(parents=True, exist_ok=True)
+        self._info_dir.mkdir(parents=True, exist_ok=True)
         
         # 加载备份信息
         self._load_backup_info()
+        
+        # 退出时保存未写入的备份信息
+        atexit.register(self.flush)
 
     def backup_file(self, file_path: Union[str, Path]) -> Path:
         """备份文件
@@ -54,7 +71,7 @@ class BackupManager:
             backup_path = self._backup_dir / backup_name
             
             # 复制文件
-            shutil.copy2(file_path, backup_path)
+            self._copy_file(file_path, backup_path)
             
             # 更新备份信息
             self._add_backup_info(file_path, backup_path)
@@ -140,6 +157,41 @@ class BackupManager:
             log.error(f"清理备份失败: {str(e)}")
             raise BackupError(f"清理失败: {str(e)}")
 
+    @staticmethod
+    def _copy_file(src: Path, dst: Path) -> None:
+        """复制文件并保留元数据
+        
+        优先使用 os.copy_file_range 在内核中复制，支持写时复制的文件系统（如Btrfs、XFS）
+        会直接共享数据块；不支持时回退到 shutil.copy2。
+        
+        不使用硬链接，因为翻译结果是原地写回原文件的，硬链接会让备份一起被修改。
+        
+        Args:
+            src: 源文件路径
+            dst: 目标文件路径
+        """
+        if hasattr(os, "copy_file_range"):
+            try:
+                with src.open("rb") as fsrc, dst.open("wb") as fdst:
+                    remaining = os.fstat(fsrc.fileno()).st_size
+                    while remaining > 0:
+                        copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                        if copied == 0:
+                            break
+                        remaining -= copied
+                if remaining == 0:
+                    shutil.copystat(src, dst)
+                    return
+            except OSError:
+                pass
+        
+        shutil.copy2(src, dst)
+
+    def flush(self) -> None:
+        """将未保存的备份信息写入磁盘"""
+        if self._dirty_shards:
+            self._save_backup_info()
+
     def _add_backup_info(self, original_path: Path, backup_path: Path) -> None:
         """添加备份信息
         
@@ -164,8 +216,8 @@ class BackupManager:
             self._backup_info[key] = []
         self._backup_info[key].append(backup_info)
         
-        # 保存备份信息
-        self._save_backup_info()
+        # 标记备份信息待保存
+        self._mark_dirty(key)
 
     def _cleanup_old_backups(
         self,
@@ -187,11 +239,11 @@ class BackupManager:
         if not backups or len(backups) <= keep_count:
             return
         
-        # 按时间戳排序
-        backups.sort(key=lambda x: x["timestamp"], reverse=True)
+        # 记录按时间从旧到新排列，开头的就是多余的旧备份
+        remove_count = len(backups) - keep_count
         
         # 删除多余的备份
-        for backup in backups[keep_count:]:
+        for backup in backups[:remove_count]:
             try:
                 backup_path = Path(backup["path"])
                 if backup_path.exists():
@@ -199,40 +251,128 @@ class BackupManager:
             except Exception as e:
                 log.warning(f"删除备份文件 {backup['path']} 失败: {str(e)}")
         
-        # 更新备份信息
-        self._backup_info[key] = backups[:keep_count]
-        self._save_backup_info()
+        # 更新备份信息，没有剩余备份时移除记录
+        if remove_count < len(backups):
+            self._backup_info[key] = backups[remove_count:]
+        else:
+            del self._backup_info[key]
+        self._mark_dirty(key)
 
     def _load_backup_info(self) -> None:
         """加载备份信息"""
         try:
-            if self._backup_info_file.exists():
-                with self._backup_info_file.open("r", encoding="utf-8") as f:
-                    self._backup_info = json.load(f)
+            # 读取所有分片
+            with os.scandir(self._info_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".json") and entry.is_file():
+                        with open(entry.path, "rb") as f:
+                            self._backup_info.update(loads_json(f.read()))
+            
+            # 迁移旧版本的单文件备份信息
+            migrated = False
+            if self._legacy_info_file.exists():
+                legacy = loads_json(self._legacy_info_file.read_bytes())
+                for key, backups in legacy.items():
+                    self._backup_info.setdefault(key, backups)
+                    self._dirty_shards.add(self._shard_of(key))
+                migrated = True
+            
+            # 一次读取备份目录，代替逐个stat备份文件
+            with os.scandir(self._backup_dir) as entries:
+                existing = {entry.name for entry in entries if entry.is_file()}
             
             # 验证备份文件是否存在
             for file_path, backups in list(self._backup_info.items()):
                 valid_backups = []
                 for backup in backups:
-                    if Path(backup["path"]).exists():
+                    backup_path = Path(backup["path"])
+                    if backup_path.parent == self._backup_dir:
+                        exists = backup_path.name in existing
+                    else:
+                        # 不在备份目录中的记录单独检查
+                        exists = backup_path.exists()
+                    if exists:
                         valid_backups.append(backup)
                 
+                # 旧版本清理后会把记录倒序保存，加载时统一为从旧到新
+                if any(
+                    prev["timestamp"] > cur["timestamp"]
+                    for prev, cur in zip(valid_backups, valid_backups[1:])
+                ):
+                    valid_backups.sort(key=lambda x: x["timestamp"])
+                elif len(valid_backups) == len(backups):
+                    continue
+                
+                self._dirty_shards.add(self._shard_of(file_path))
                 if valid_backups:
                     self._backup_info[file_path] = valid_backups
                 else:
                     del self._backup_info[file_path]
             
-            # 保存清理后的信息
-            self._save_backup_info()
+            # 记录有变化时才保存
+            if self._dirty_shards:
+                self._save_backup_info()
+            
+            # 迁移完成后删除旧文件
+            if migrated and not self._dirty_shards:
+                self._legacy_info_file.unlink()
             
         except Exception as e:
             log.error(f"加载备份信息失败: {str(e)}")
             self._backup_info = {}
 
+    @staticmethod
+    def _shard_of(key: str) -> str:
+        """计算备份记录所在的分片名
+        
+        Args:
+            key: 原文件路径
+            
+        Returns:
+            str: 分片名，为路径SHA1的前两位十六进制字符
+        """
+        return hashlib.sha1(key.encode("utf-8")).hexdigest()[:2]
+
+    def _mark_dirty(self, key: str) -> None:
+        """标记备份记录所在的分片已修改，距上次保存超过间隔时立即保存
+        
+        Args:
+            key: 原文件路径
+        """
+        self._dirty_shards.add(self._shard_of(key))
+        interval = self.config.auto_flush_interval
+        if interval > 0 and time.monotonic() - self._last_flush >= interval:
+            self._save_backup_info()
+
     def _save_backup_info(self) -> None:
-        """保存备份信息"""
+        """保存有变化的分片，每个分片先写临时文件再原子替换"""
         try:
-            with self._backup_info_file.open("w", encoding="utf-8") as f:
-                json.dump(self._backup_info, f, indent=2, ensure_ascii=False)
+            # 收集待保存分片中的记录
+            shards: Dict[str, Dict[str, List[Dict]]] = {
+                shard: {} for shard in self._dirty_shards
+            }
+            for key, backups in self._backup_info.items():
+                shard = self._shard_of(key)
+                if shard in shards:
+                    shards[shard][key] = backups
+            
+            for shard, data in shards.items():
+                shard_file = self._info_dir / f"{shard}.json"
+                if not data:
+                    # 分片已无记录
+                    if shard_file.exists():
+                        shard_file.unlink()
+                else:
+                    fd, tmp_path = tempfile.mkstemp(dir=self._info_dir, suffix=".tmp")
+                    try:
+                        with os.fdopen(fd, "wb") as f:
+                            f.write(dumps_json(data))
+                        os.replace(tmp_path, shard_file)
+                    except Exception:
+                        os.unlink(tmp_path)
+                        raise
+                self._dirty_shards.discard(shard)
+            
+            self._last_flush = time.monotonic()
         except Exception as e:
-            log.error(f"保存备份信息失败: {str(e)}") 
\ No newline at end of file
+            log.error(f"保存备份信息失败: {str(e)}")
@@ -1,13 +1,76 @@
 """
 黑名单管理模块
 """
-import json
+import functools
 import re
 from pathlib import Path
-from typing import Dict, List, Optional, Pattern, Set, Union
+from typing import Dict, List, Optional, Pattern, Set, Tuple, Union
+
+from sortedcontainers import SortedKeyList, SortedSet
+
+try:
+    import ahocorasick
+except ImportError:  # pyahocorasick为可选依赖，未安装时使用合并的正则
+    ahocorasick = None
 
 from ..config import BlacklistConfig
-from ..utils import BlacklistError, log
+from ..utils import BlacklistError, dumps_json, loads_json, log
+
+# 词汇数达到该值时才使用Aho-Corasick自动机，词汇较少时正则更快
+AUTOMATON_MIN_WORDS = 50
+
+
+@functools.lru_cache(maxsize=32)
+def _compile_patterns(patterns: Tuple[str, ...], case_sensitive: bool) -> Tuple[Pattern, ...]:
+    """编译一组正则表达式，相同的模式组合只编译一次
+    
+    Args:
+        patterns: 正则表达式元组
+        case_sensitive: 是否大小写敏感
+        
+    Returns:
+        Tuple[Pattern, ...]: 编译后的正则表达式
+        
+    Raises:
+        BlacklistError: 正则表达式为空或无效
+    """
+    flags = 0 if case_sensitive else re.IGNORECASE
+    compiled = []
+    for pattern in patterns:
+        if not pattern:
+            raise BlacklistError("正则表达式不能为空")
+        try:
+            compiled.append(re.compile(pattern, flags))
+        except re.error as e:
+            raise BlacklistError(f"无效的正则表达式: {str(e)}")
+    return tuple(compiled)
+
+
+@functools.lru_cache(maxsize=32)
+def _combine_patterns(patterns: Tuple[str, ...], case_sensitive: bool) -> Optional[Pattern]:
+    """将一组正则表达式合并为一个分支表达式，一次扫描即可判断是否匹配任一模式
+    
+    合并后各模式的分组会被重新编号，编号反向引用会指向错误的分组，因此含有
+    捕获分组的模式不合并。合并结果只用于判断是否匹配，不用于收集匹配内容。
+    
+    Args:
+        patterns: 已校验过的正则表达式元组
+        case_sensitive: 是否大小写敏感
+        
+    Returns:
+        Optional[Pattern]: 合并后的正则表达式，没有模式或无法合并（如含捕获分组）时返回None
+    """
+    if not patterns:
+        return None
+    
+    flags = 0 if case_sensitive else re.IGNORECASE
+    if any(re.compile(pattern, flags).groups for pattern in patterns):
+        return None
+    
+    try:
+        return re.compile("|".join(f"(?:{pattern})" for pattern in patterns), flags)
+    except re.error:
+        return None
 
 
 class BlacklistManager:
@@ -20,9 +83,20 @@ class BlacklistManager:
             config: 黑名单配置
         """
         self.config = config
-        self._words: Set[str] = set()
-        self._patterns: List[Pattern] = []
+        # 有序存储，列出黑名单时无需再排序
+        self._words: SortedSet = SortedSet()
+        self._patterns: SortedKeyList = SortedKeyList(key=lambda p: p.pattern)
         self._case_sensitive = config.case_sensitive
+        self._flags = 0 if self._case_sensitive else re.IGNORECASE
+        
+        # 词汇匹配器：词汇较多且安装了pyahocorasick时使用自动机，否则使用合并的正则，
+        # 词汇变化后在下次匹配时重建
+        self._automaton = None
+        self._word_pattern: Optional[Pattern] = None
+        self._words_dirty = True
+        
+        # 所有正则合并后的表达式，正则变化时重建
+        self._combined: Optional[Pattern] = None
         
         # 加载内置黑名单
         self._load_builtin_blacklist()
@@ -47,6 +121,7 @@ class BlacklistManager:
             word = word.lower()
         
         self._words.add(word)
+        self._words_dirty = True
         log.debug(f"添加黑名单词汇: {word}")
 
     def add_pattern(self, pattern: str) -> None:
@@ -63,10 +138,10 @@ class BlacklistManager:
                 raise BlacklistError("正则表达式不能为空")
             
             # 编译正则表达式
-            flags = 0 if self._case_sensitive else re.IGNORECASE
-            regex = re.compile(pattern, flags)
+            regex = re.compile(pattern, self._flags)
             
-            self._patterns.append(regex)
+            self._patterns.add(regex)
+            self._rebuild_combined()
             log.debug(f"添加黑名单正则: {pattern}")
             
         except re.error as e:
@@ -86,6 +161,7 @@ class BlacklistManager:
         
         try:
             self._words.remove(word)
+            self._words_dirty = True
             log.debug(f"移除黑名单词汇: {word}")
         except KeyError:
             raise BlacklistError(f"词汇不存在: {word}")
@@ -97,38 +173,49 @@ class BlacklistManager:
             pattern: 正则表达式
             
         Raises:
-            BlacklistError: 移除失败
+            BlacklistError: 正则表达式不存在
         """
-        flags = 0 if self._case_sensitive else re.IGNORECASE
-        try:
-            regex = re.compile(pattern, flags)
-            self._patterns = [p for p in self._patterns if p.pattern != regex.pattern]
-            log.debug(f"移除黑名单正则: {pattern}")
-        except re.error:
-            raise BlacklistError(f"无效的正则表达式: {pattern}")
+        # 已添加的正则都编译过，直接按模式字符串查找，无需重新编译
+        matches = list(self._patterns.irange_key(pattern, pattern))
+        if not matches:
+            raise BlacklistError(f"正则表达式不存在: {pattern}")
+        
+        for regex in matches:
+            self._patterns.remove(regex)
+        self._rebuild_combined()
+        log.debug(f"移除黑名单正则: {pattern}")
 
-    def is_protected(self, text: str) -> bool:
+    def is_protected(self, text: str, *, lowered: Optional[str] = None) -> bool:
         """检查文本是否包含黑名单内容
         
         Args:
             text: 要检查的文本
+            lowered: 调用方已计算好的 text.lower()，对同一文本多次检查时可避免重复转换
             
         Returns:
             bool: 是否包含黑名单内容
         """
         # 检查词汇
-        check_text = text if self._case_sensitive else text.lower()
-        if any(word in check_text for word in self._words):
-            return True
+        check_text = self._check_text(text, lowered)
+        self._build_word_matchers()
+        if self._automaton is not None:
+            if next(self._automaton.iter(check_text), None) is not None:
+                return True
+        elif self._word_pattern is not None:
+            if self._word_pattern.search(check_text) is not None:
+                return True
         
         # 检查正则
+        if self._combined is not None:
+            return self._combined.search(text) is not None
         return any(pattern.search(text) for pattern in self._patterns)
 
-    def get_matches(self, text: str) -> Dict[str, List[str]]:
+    def get_matches(self, text: str, *, lowered: Optional[str] = None) -> Dict[str, List[str]]:
         """获取文本中的黑名单匹配
         
         Args:
             text: 要检查的文本
+            lowered: 调用方已计算好的 text.lower()，对同一文本多次检查时可避免重复转换
             
         Returns:
             Dict[str, List[str]]: 匹配结果，格式为 {"words": [...], "patterns": [...]}
@@ -139,12 +226,20 @@ class BlacklistManager:
         }
         
         # 检查词汇
-        check_text = text if self._case_sensitive else text.lower()
-        for word in self._words:
-            if word in check_text:
-                result["words"].append(word)
+        check_text = self._check_text(text, lowered)
+        self._build_word_matchers()
+        if self._automaton is not None:
+            # 一次扫描找出所有词汇，按词汇顺序返回且不重复
+            result["words"] = sorted({word for _, word in self._automaton.iter(check_text)})
+        elif self._word_pattern is not None:
+            # 前瞻匹配得到每个位置上最长的词汇，其中包含的较短词汇也一定出现在文本中
+            found = {m.group(1) for m in self._word_pattern.finditer(check_text)}
+            result["words"] = [
+                word for word in self._words
+                if word in found or any(word in match for match in found)
+            ]
         
-        # 检查正则
+        # 检查正则（逐个模式查找，合并的正则会丢失不同模式间重叠的匹配）
         for pattern in self._patterns:
             matches = pattern.findall(text)
             if matches:
@@ -168,8 +263,7 @@ class BlacklistManager:
                 "patterns": [p.pattern for p in self._patterns],
             }
             
-            with open(file_path, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            Path(file_path).write_bytes(dumps_json(data))
             
             log.debug(f"已导出黑名单到: {file_path}")
             
@@ -187,15 +281,17 @@ class BlacklistManager:
             BlacklistError: 加载失败
         """
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            data = loads_json(Path(file_path).read_bytes())
             
             # 清除现有黑名单
             self._words.clear()
             self._patterns.clear()
+            self._words_dirty = True
+            self._combined = None
             
             # 设置大小写敏感
             self._case_sensitive = data.get("case_sensitive", self.config.case_sensitive)
+            self._flags = 0 if self._case_sensitive else re.IGNORECASE
             
             # 加载词汇
             for word in data.get("words", []):
@@ -211,6 +307,50 @@ class BlacklistManager:
             log.error(f"加载黑名单失败: {str(e)}")
             raise BlacklistError(f"加载失败: {str(e)}")
 
+    def _check_text(self, text: str, lowered: Optional[str]) -> str:
+        """获取用于匹配词汇的文本
+        
+        Args:
+            text: 原始文本
+            lowered: 调用方提供的小写文本
+            
+        Returns:
+            str: 大小写敏感时为原文，否则为小写文本
+        """
+        if self._case_sensitive:
+            return text
+        return lowered if lowered is not None else text.lower()
+
+    def _build_word_matchers(self) -> None:
+        """词汇变化后重建词汇匹配器
+        
+        词汇较多且安装了pyahocorasick时构建Aho-Corasick自动机，否则将所有词汇按长度
+        降序合并为一个前瞻正则，两者都只需一次线性扫描即可找出文本中的词汇。
+        """
+        if not self._words_dirty:
+            return
+        
+        self._automaton = None
+        self._word_pattern = None
+        if ahocorasick is not None and len(self._words) >= AUTOMATON_MIN_WORDS:
+            automaton = ahocorasick.Automaton()
+            for word in self._words:
+                automaton.add_word(word, word)
+            automaton.make_automaton()
+            self._automaton = automaton
+        elif self._words:
+            words = sorted(self._words, key=len, reverse=True)
+            self._word_pattern = re.compile(
+                "(?=(" + "|".join(map(re.escape, words)) + "))"
+            )
+        self._words_dirty = False
+
+    def _rebuild_combined(self) -> None:
+        """重建合并后的正则表达式"""
+        self._combined = _combine_patterns(
+            tuple(p.pattern for p in self._patterns), self._case_sensitive
+        )
+
     def _load_builtin_blacklist(self) -> None:
         """加载内置黑名单"""
         try:
@@ -218,9 +358,11 @@ class BlacklistManager:
             for word in self.config.words:
                 self.add_word(word)
             
-            # 加载内置正则
-            for pattern in self.config.patterns:
-                self.add_pattern(pattern)
+            # 加载内置正则（编译结果在多个实例间共享）
+            self._patterns.update(
+                _compile_patterns(tuple(self.config.patterns), self._case_sensitive)
+            )
+            self._rebuild_combined()
             
             log.debug("已加载内置黑名单")
             
@@ -1,15 +1,35 @@
 """
 分块管理模块
 """
+import bisect
+import itertools
+import random
 import re
+import zlib
 from dataclasses import dataclass
-from typing import Dict, Generator, List, Optional, Tuple, Union
+from typing import Dict, Generator, Iterable, List, Optional, Pattern, Tuple, Union
 
 from pydantic import BaseModel
 
-from ..config import TranslationConfig, ChunkConfig
+from ..config import ChunkConfig
 from ..utils import ChunkError, log
 
+# Gear哈希表：每个值为64位随机数，使用固定种子，保证不同进程中得到相同的分块边界
+_gear_random = random.Random(0x59414D4C)
+_GEAR: Tuple[int, ...] = tuple(_gear_random.getrandbits(64) for _ in range(256))
+del _gear_random
+_HASH_BITS = 64
+_HASH_MASK = (1 << _HASH_BITS) - 1
+
+# 除 \n 外 str.splitlines() 还会识别的换行符
+_OTHER_LINE_BREAKS = re.compile("[\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]")
+
+# 统一为 \n 时需要替换的换行符，\r\n 作为一个整体
+_NON_LF_LINE_BREAKS = re.compile("\r\n|" + _OTHER_LINE_BREAKS.pattern)
+
+# str.splitlines() 识别的所有换行字符
+_LINE_BREAK_CHARS = "\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029"
+
 
 @dataclass
 class ChunkInfo:
@@ -17,7 +37,7 @@ class ChunkInfo:
     index: int  # 块索引
     start_line: int  # 起始行号（从1开始）
     end_line: int  # 结束行号（包含）
-    content: str  # 块内容
+    content: str  # 块内容，包含每行的换行符
     context: Optional[str] = None  # 上下文信息
     level: int = 0  # 缩进级别
     is_complete: bool = True  # 是否完整块
@@ -34,17 +54,32 @@ class ChunkResult(BaseModel):
 class ChunkManager:
     """分块管理器"""
 
-    def __init__(self, config: TranslationConfig):
+    def __init__(self, config: ChunkConfig, chunk_size: int):
         """初始化分块管理器
         
         Args:
-            config: 翻译配置
+            config: 分块配置
+            chunk_size: 每个块的目标行数（TranslationConfig.chunk_size）
         """
         self.config = config
-        self._chunk_size = config.chunk_size
-        self._context_lines = 2  # 每个块保留的上下文行数
+        self._chunk_size = chunk_size
+        self._context_lines = config.context_lines  # 每个块保留的上下文行数
         self._chunks: List[ChunkInfo] = []
-        self._context_cache: Dict[int, str] = {}
+        
+        # 块的最大字符数
+        self._max_chunk_size = config.max_chunk_size
+        
+        # 将分块关键字预编译为一个正则，每行只需扫描一次
+        keywords = config.split_keywords
+        self._split_keyword_re: Optional[Pattern] = (
+            re.compile("|".join(map(re.escape, keywords))) if keywords else None
+        )
+        
+        # 基于内容的分块掩码（FastCDC的分块大小归一化）：未达到块大小时使用更严格的掩码，
+        # 超过后使用更宽松的掩码，使块大小集中在 chunk_size 附近
+        bits = max(1, (self._chunk_size // 2).bit_length() - 1)
+        self._strict_mask = self._high_bits_mask(bits + 1)
+        self._loose_mask = self._high_bits_mask(max(bits - 1, 1))
 
     def split_text(self, text: str) -> List[ChunkInfo]:
         """将文本分块
@@ -55,26 +90,43 @@ class ChunkManager:
         Returns:
             List[ChunkInfo]: 分块信息列表
             
+        Raises:
+            ChunkError: 分块错误
+        """
+        return list(self.iter_chunks(text))
+
+    def iter_chunks(self, text: str) -> Generator[ChunkInfo, None, None]:
+        """逐个生成文本的分块
+        
+        只保留行列表及其偏移、缩进等逐行信息，块在需要时才生成，调用方可以边分块边处理，
+        处理完的块内容无需常驻内存。
+        
+        Args:
+            text: 要分块的文本
+            
+        Yields:
+            ChunkInfo: 分块信息
+            
         Raises:
             ChunkError: 分块错误
         """
         try:
+            # 文本不需要分块时直接返回一个块，不必按行分割
+            line_count = self._single_chunk_lines(text)
+            if line_count is not None:
+                yield ChunkInfo(index=0, start_line=1, end_line=line_count, content=text)
+                return
+            
             # 按行分割文本
             lines = text.splitlines()
             total_lines = len(lines)
             
-            # 如果总行数小于块大小，直接返回一个块
-            if total_lines <= self._chunk_size:
-                return [
-                    ChunkInfo(
-                        index=0,
-                        start_line=1,
-                        end_line=total_lines,
-                        content=text,
-                    )
-                ]
+            # 每行在原文中的起始位置，块内容直接从原文切片
+            offsets = self._line_offsets(text)
+            
+            # 每行内容对应的Gear值，用于基于内容查找分块边界
+            gears = self._line_gears(lines)
             
-            chunks: List[ChunkInfo] = []
             current_index = 0
             current_line = 0
             
@@ -84,30 +136,39 @@ class ChunkManager:
                 chunk_end = min(chunk_start + self._chunk_size, total_lines)
                 
                 # 调整块的边界到合适的分割点
-                chunk_end = self._find_chunk_boundary(lines, chunk_end)
+                chunk_end = self._find_chunk_boundary(
+                    text, lines, offsets, gears, chunk_start, chunk_end
+                )
+                
+                # 整个文本只有一个块时直接使用原文
+                if chunk_start == 0 and chunk_end == total_lines:
+                    yield ChunkInfo(
+                        index=0,
+                        start_line=1,
+                        end_line=total_lines,
+                        content=text,
+                    )
+                    return
                 
-                # 提取块内容
-                chunk_content = "\n".join(lines[chunk_start:chunk_end])
+                # 提取块内容，保留每行的换行符，所有块按顺序拼接即为原文
+                chunk_content = text[offsets[chunk_start]:offsets[chunk_end]]
                 
                 # 获取上下文
-                context = self._get_context(lines, chunk_start, chunk_end, total_lines)
+                context = self._get_context(text, lines, offsets, chunk_start, chunk_end)
                 
-                # 创建分块信息
-                chunk = ChunkInfo(
+                # 生成分块信息
+                yield ChunkInfo(
                     index=current_index,
                     start_line=chunk_start + 1,  # 转换为1-based行号
                     end_line=chunk_end,
                     content=chunk_content,
                     context=context,
                 )
-                chunks.append(chunk)
                 
                 # 更新索引和行号
                 current_index += 1
                 current_line = chunk_end
             
-            return chunks
-            
         except Exception as e:
             log.error(f"Failed to split text: {str(e)}")
             raise ChunkError("Failed to split text", details=str(e))
@@ -115,15 +176,15 @@ class ChunkManager:
     def merge_results(
         self,
         original_text: str,
-        results: List[ChunkResult],
-        chunks: List[ChunkInfo],
+        results: Iterable[ChunkResult],
+        chunks: Iterable[ChunkInfo],
     ) -> str:
         """合并处理结果
         
         Args:
             original_text: 原始文本
-            results: 块处理结果列表
-            chunks: 原始分块信息列表
+            results: 块处理结果，可以是任意可迭代对象
+            chunks: 原始分块信息，可以是 iter_chunks 生成的迭代器
             
         Returns:
             str: 合并后的文本
@@ -132,35 +193,38 @@ class ChunkManager:
             ChunkError: 合并错误
         """
         try:
+            # 按索引排序结果
+            sorted_results = sorted(results, key=lambda x: x.index)
+            sorted_chunks = sorted(chunks, key=lambda x: x.index)
+            
             # 验证结果完整性
-            if len(results) != len(chunks):
+            if len(sorted_results) != len(sorted_chunks):
                 raise ChunkError(
                     "Results count does not match chunks count",
-                    details=f"Results: {len(results)}, Chunks: {len(chunks)}",
+                    details=f"Results: {len(sorted_results)}, Chunks: {len(sorted_chunks)}",
                 )
             
-            # 按索引排序结果
-            sorted_results = sorted(results, key=lambda x: x.index)
-            sorted_chunks = sorted(chunks, key=lambda x: x.index)
-            
             # 检查是否所有块都处理成功
             failed_chunks = [r for r in sorted_results if not r.success]
             if failed_chunks:
                 chunk_errors = "\n".join(f"Chunk {r.index}: {r.error}" for r in failed_chunks)
                 raise ChunkError("Some chunks failed to process", details=chunk_errors)
             
-            # 合并结果
+            # 合并结果：块已按位置排序，一次遍历依次拼接块之间的原文和块的结果，
+            # 避免在原列表上反复切片赋值移动后续元素
             lines = original_text.splitlines()
+            merged: List[str] = []
+            current = 0
             for result, chunk in zip(sorted_results, sorted_chunks):
-                # 将结果内容按行分割
-                result_lines = result.content.splitlines()
-                
-                # 替换原文中对应的行
                 start_idx = chunk.start_line - 1  # 转换为0-based索引
-                end_idx = chunk.end_line
-                lines[start_idx:end_idx] = result_lines
+                
+                # 保留块之前未处理的行，再替换为块的结果
+                merged.extend(lines[current:start_idx])
+                merged.extend(result.content.splitlines())
+                current = chunk.end_line
+            merged.extend(lines[current:])
             
-            return "\n".join(lines)
+            return "\n".join(merged)
             
         except ChunkError:
             raise
@@ -168,78 +232,251 @@ class ChunkManager:
             log.error(f"Failed to merge results: {str(e)}")
             raise ChunkError("Failed to merge results", details=str(e))
 
-    def _find_chunk_boundary(self, lines: List[str], end: int) -> int:
+    def _single_chunk_lines(self, text: str) -> Optional[int]:
+        """判断文本是否只需要一个块
+        
+        只用 str.count 和正则扫描判断，不构建行列表。
+        
+        Args:
+            text: 要分块的文本
+            
+        Returns:
+            Optional[int]: 只需要一个块时返回行数，否则返回None
+        """
+        # 含有其他换行符时行数与 splitlines() 不一致，交给完整流程处理
+        if _OTHER_LINE_BREAKS.search(text):
+            return None
+        
+        line_count = text.count("\n") + (1 if text and not text.endswith("\n") else 0)
+        if line_count > self._chunk_size:
+            return None
+        
+        # 超过最大字符数时仍需分块
+        if self._max_chunk_size and len(text) > self._max_chunk_size:
+            return None
+        
+        # 第一行之后出现分块关键字时仍需分块
+        if self._split_keyword_re is not None:
+            first_break = text.find("\n")
+            if first_break >= 0 and self._split_keyword_re.search(text, first_break + 1):
+                return None
+        
+        return line_count
+
+    def _find_chunk_boundary(
+        self,
+        text: str,
+        lines: List[str],
+        offsets: List[int],
+        gears: List[int],
+        start: int,
+        end: int,
+    ) -> int:
         """查找合适的块边界
         
+        剩余内容超过块大小时，先按行内容的滚动哈希选择边界，再按最大字符数和分块关键字缩短块。
+        
+        Args:
+            text: 原始文本
+            lines: 文本行列表
+            offsets: 每行的起始位置
+            gears: 每行的Gear值
+            start: 块的起始位置
+            end: 按块大小计算的结束位置
+            
+        Returns:
+            int: 调整后的结束位置
+        """
+        # 剩余内容超过块大小时才需要查找分割点
+        if end < len(lines):
+            end = self._find_content_defined_boundary(lines, gears, start, end)
+        
+        # 块的字符数不超过上限，但至少包含一行
+        if self._max_chunk_size:
+            limit = bisect.bisect_right(offsets, offsets[start] + self._max_chunk_size) - 1
+            end = min(end, max(limit, start + 1))
+        
+        # 块内出现分块关键字时，在关键字所在行之前分割
+        if self._split_keyword_re is not None and end - start > 1:
+            match = self._split_keyword_re.search(text, offsets[start + 1], offsets[end])
+            if match:
+                end = bisect.bisect_right(offsets, match.start()) - 1
+        
+        return end
+
+    def _find_content_defined_boundary(
+        self,
+        lines: List[str],
+        gears: List[int],
+        start: int,
+        end: int,
+    ) -> int:
+        """按行内容的Gear滚动哈希查找分块边界（FastCDC）
+        
+        边界只取决于附近几十行的内容，文件前面插入或删除内容后，后面的块边界保持不变，
+        未修改部分的块内容相同，可以直接命中翻译缓存。块大小限制在 chunk_size 的
+        1/2 到 2 倍之间；范围内没有哈希边界时，退回到在块大小附近查找空行或缩进减少的行。
+        
         Args:
             lines: 文本行列表
-            end: 当前的结束位置
+            gears: 每行的Gear值
+            start: 块的起始位置
+            end: 按块大小计算的结束位置
             
         Returns:
             int: 调整后的结束位置
         """
-        # 如果已经到达文件末尾，直接返回
-        if end >= len(lines):
-            return end
+        total_lines = len(lines)
+        min_end = start + max(self._chunk_size // 2, 1)
+        max_end = min(start + self._chunk_size * 2, total_lines)
+        
+        # 哈希只保留最近64行的影响，从最小块大小之前64行开始计算（可以早于块的起始位置），
+        # 这样每个位置的哈希值只取决于附近的内容，与块从哪里开始无关
+        hash_value = 0
+        for i in range(max(0, min_end - _HASH_BITS), max_end):
+            hash_value = ((hash_value << 1) + gears[i]) & _HASH_MASK
+            cut = i + 1
+            if cut < min_end:
+                continue
             
-        # 向后查找，直到找到一个合适的分割点（空行或缩进减少的行）
+            mask = self._strict_mask if cut < end else self._loose_mask
+            if not hash_value & mask:
+                return cut
+        
+        if max_end >= total_lines:
+            return total_lines
+        
+        # 没有哈希边界时，向后查找空行或缩进减少的行，只需计算这几行的缩进
         max_look_ahead = 10  # 最大向后查找行数
-        for i in range(end, min(end + max_look_ahead, len(lines))):
-            current_line = lines[i]
+        window_start = end - 1
+        indents, empty = self._measure_lines(lines[window_start:end + max_look_ahead])
+        for offset in range(1, len(indents)):
+            i = window_start + offset
             
             # 如果是空行，可以作为分割点
-            if not current_line.strip():
+            if empty[offset]:
                 return i + 1
             
             # 如果缩进减少，可以作为分割点
-            if i > 0 and self._get_indent_level(current_line) < self._get_indent_level(lines[i - 1]):
+            if indents[offset] < indents[offset - 1]:
                 return i
         
         # 如果没找到合适的分割点，就使用原始位置
         return end
 
-    def _get_indent_level(self, line: str) -> int:
-        """获取行的缩进级别
+    @staticmethod
+    def _high_bits_mask(bits: int) -> int:
+        """生成覆盖哈希最高若干位的掩码
+        
+        Gear哈希每次左移一位，低位只受最近几行影响，使用高位判断边界才能覆盖完整的窗口。
+        
+        Args:
+            bits: 掩码位数
+            
+        Returns:
+            int: 掩码
+        """
+        return ((1 << bits) - 1) << (_HASH_BITS - bits)
+
+    @staticmethod
+    def _line_gears(lines: List[str]) -> List[int]:
+        """计算每行内容对应的Gear值
+        
+        使用CRC32而不是内置 hash()，后者对字符串的结果在每个进程中随机化。
+        
+        Args:
+            lines: 文本行列表
+            
+        Returns:
+            List[int]: 每行的Gear值
+        """
+        gear = _GEAR
+        return [gear[crc & 0xFF] for crc in map(zlib.crc32, map(str.encode, lines))]
+
+    @staticmethod
+    def _measure_lines(lines: List[str]) -> Tuple[List[int], List[bool]]:
+        """一次遍历计算每行的缩进和是否为空行
+        
+        Args:
+            lines: 文本行列表
+            
+        Returns:
+            Tuple[List[int], List[bool]]: (每行的缩进空格数, 每行是否为空行)
+        """
+        indents = [len(line) - len(line.lstrip()) for line in lines]
+        empty = [not line or line.isspace() for line in lines]
+        return indents, empty
+
+    @staticmethod
+    def _line_offsets(text: str) -> List[int]:
+        """计算每行在原文中的起始位置
         
         Args:
-            line: 文本行
+            text: 原始文本
+            
+        Returns:
+            List[int]: 每行的起始位置，末尾追加文本总长度
+        """
+        return list(itertools.accumulate(
+            map(len, text.splitlines(keepends=True)), initial=0
+        ))
+
+    @staticmethod
+    def _slice_lines(
+        text: str,
+        lines: List[str],
+        offsets: List[int],
+        start: int,
+        end: int,
+    ) -> str:
+        """从原文中切出 [start, end) 行，不包含最后一行的换行符
+        
+        Args:
+            text: 原始文本
+            lines: 文本行列表
+            offsets: 每行的起始位置
+            start: 起始行（包含）
+            end: 结束行（不包含）
             
         Returns:
-            int: 缩进空格数
+            str: 对应行的原文
         """
-        return len(line) - len(line.lstrip())
+        return text[offsets[start]:offsets[end - 1] + len(lines[end - 1])]
 
     def _get_context(
         self,
+        text: str,
         lines: List[str],
+        offsets: List[int],
         start: int,
         end: int,
-        total_lines: int,
     ) -> Optional[str]:
         """获取块的上下文
         
         Args:
+            text: 原始文本
             lines: 文本行列表
+            offsets: 每行的起始位置
             start: 块的起始位置
             end: 块的结束位置
-            total_lines: 总行数
             
         Returns:
             Optional[str]: 上下文信息，如果不需要则返回None
         """
-        context_lines = []
+        total_lines = len(lines)
+        context_parts = []
         
         # 添加前置上下文
         if start > 0:
             context_start = max(0, start - self._context_lines)
-            context_lines.extend(lines[context_start:start])
+            context_parts.append(self._slice_lines(text, lines, offsets, context_start, start))
         
         # 添加后置上下文
         if end < total_lines:
             context_end = min(total_lines, end + self._context_lines)
-            context_lines.extend(lines[end:context_end])
+            context_parts.append(self._slice_lines(text, lines, offsets, end, context_end))
         
-        return "\n".join(context_lines) if context_lines else None
+        return "\n".join(context_parts) if context_parts else None
 
     def estimate_chunks(self, text: str) -> Tuple[int, int]:
         """估算文本的分块数量和每块的大致大小
@@ -250,8 +487,8 @@ class ChunkManager:
         Returns:
             Tuple[int, int]: (预计分块数, 每块的大致行数)
         """
-        lines = text.splitlines()
-        total_lines = len(lines)
+        # 只需要行数，直接统计换行符，不必构建行列表
+        total_lines = text.count("\n") + (1 if text and not text.endswith("\n") else 0)
         
         if total_lines <= self._chunk_size:
             return 1, total_lines
@@ -277,6 +514,9 @@ class ChunkManager:
     def split_content(self, content: str) -> List[str]:
         """分割内容为多个块
         
+        与 split_text 使用相同的分块逻辑，并记录分块信息供 merge_chunks 和
+        get_context 使用。
+        
         Args:
             content: 要分割的内容
             
@@ -286,36 +526,14 @@ class ChunkManager:
         Raises:
             ChunkError: 分块失败
         """
-        try:
-            # 清除缓存
-            self._chunks.clear()
-            self._context_cache.clear()
-            
-            # 按行分割
-            lines = content.splitlines()
-            
-            # 分析结构
-            structure = self._analyze_structure(lines)
-            
-            # 智能分块
-            chunks = self._smart_split(lines, structure)
-            
-            # 优化块边界
-            chunks = self._optimize_boundaries(chunks)
-            
-            # 添加上下文
-            chunks = self._add_context(chunks)
-            
-            # 返回块内容
-            return [chunk.content for chunk in chunks]
-            
-        except Exception as e:
-            log.error(f"分块失败: {str(e)}")
-            raise ChunkError(f"分块失败: {str(e)}")
+        self._chunks = self.split_text(content)
+        return [chunk.content for chunk in self._chunks]
 
     def merge_chunks(self, chunks: List[str]) -> str:
         """合并多个块
         
+        每个块末尾的换行与 split_content 得到的原文块一致，\r\n 等换行符统一为 \n。
+        
         Args:
             chunks: 要合并的块列表
             
@@ -333,236 +551,55 @@ class ChunkManager:
             if len(chunks) != len(self._chunks):
                 raise ChunkError("块数量不匹配")
             
-            # 按行号重建内容
-            result_lines = []
+            # 按行号重建内容：块包含每行的换行符，整块直接拼接
+            parts: List[str] = []
             current_line = 0
             
             for chunk, info in zip(chunks, self._chunks):
-                # 添加缺失的行
-                if info.start_line > current_line:
-                    result_lines.extend([""] * (info.start_line - current_line))
+                # 块之间缺失的行以空行补齐
+                start_idx = info.start_line - 1  # 转换为0-based索引
+                if start_idx > current_line:
+                    parts.append("\n" * (start_idx - current_line))
                 
-                # 添加块内容
-                chunk_lines = chunk.splitlines()
-                result_lines.extend(chunk_lines)
+                # 译文常会去掉或多出末尾的换行，按原文块恢复，避免相邻块首尾相连或多出空行
+                parts.append(self._keep_line_ending(info.content, chunk))
                 current_line = info.end_line
             
-            return "\n".join(result_lines)
+            merged = "".join(parts)
+            
+            # 块是原文切片，含\r\n等其他换行符时统一为\n
+            if _OTHER_LINE_BREAKS.search(merged):
+                merged = _NON_LF_LINE_BREAKS.sub("\n", merged)
+            return merged
             
         except Exception as e:
             log.error(f"合并块失败: {str(e)}")
             raise ChunkError(f"合并块失败: {str(e)}")
 
-    def get_context(self, chunk_index: int) -> Optional[str]:
-        """获取块的上下文信息
-        
-        Args:
-            chunk_index: 块索引
-            
-        Returns:
-            Optional[str]: 上下文信息
-        """
-        return self._context_cache.get(chunk_index)
-
-    def _analyze_structure(self, lines: List[str]) -> List[Tuple[int, int]]:
-        """分析内容结构
-        
-        Args:
-            lines: 内容行列表
-            
-        Returns:
-            List[Tuple[int, int]]: 结构信息列表，每项为(行号, 缩进级别)
-        """
-        structure = []
-        current_level = 0
-        level_stack = []
-        
-        for i, line in enumerate(lines):
-            # 计算缩进级别
-            indent = len(line) - len(line.lstrip())
-            level = indent // 2  # 假设使用2个空格作为缩进
-            
-            # 跳过空行
-            if not line.strip():
-                continue
-            
-            # 处理缩进变化
-            if level > current_level:
-                level_stack.append(current_level)
-                current_level = level
-            elif level < current_level:
-                while level_stack and level <= level_stack[-1]:
-                    current_level = level_stack.pop()
-            
-            structure.append((i, level))
-        
-        return structure
-
-    def _smart_split(
-        self,
-        lines: List[str],
-        structure: List[Tuple[int, int]],
-    ) -> List[ChunkInfo]:
-        """智能分块
-        
-        Args:
-            lines: 内容行列表
-            structure: 结构信息列表
-            
-        Returns:
-            List[ChunkInfo]: 分块信息列表
-        """
-        chunks = []
-        current_chunk = []
-        current_start = 0
-        current_level = 0
-        chunk_size = 0
-        
-        for i, (line_num, level) in enumerate(structure):
-            line = lines[line_num]
-            line_size = len(line)
-            
-            # 检查是否需要分块
-            need_split = False
-            
-            # 大小超限
-            if chunk_size + line_size > self.config.max_chunk_size:
-                need_split = True
-            
-            # 缩进级别变化
-            if level < current_level:
-                need_split = True
-            
-            # 关键字触发
-            if any(kw in line for kw in self.config.split_keywords):
-                need_split = True
-            
-            # 创建新块
-            if need_split and current_chunk:
-                chunk_content = "\n".join(current_chunk)
-                chunks.append(ChunkInfo(
-                    index=i,
-                    start_line=current_start,
-                    end_line=line_num,
-                    content=chunk_content,
-                    level=current_level,
-                ))
-                
-                current_chunk = []
-                current_start = line_num
-                chunk_size = 0
-            
-            # 添加当前行
-            current_chunk.append(line)
-            chunk_size += line_size
-            current_level = level
-        
-        # 添加最后一个块
-        if current_chunk:
-            chunk_content = "\n".join(current_chunk)
-            chunks.append(ChunkInfo(
-                index=len(structure),
-                start_line=current_start,
-                end_line=len(lines),
-                content=chunk_content,
-                level=current_level,
-            ))
-        
-        return chunks
-
-    def _optimize_boundaries(self, chunks: List[ChunkInfo]) -> List[ChunkInfo]:
-        """优化块边界
-        
-        Args:
-            chunks: 分块信息列表
-            
-        Returns:
-            List[ChunkInfo]: 优化后的分块信息列表
-        """
-        if not chunks:
-            return chunks
-        
-        optimized = []
-        
-        for i, chunk in enumerate(chunks):
-            # 检查是否需要合并
-            if i > 0 and self._should_merge(optimized[-1], chunk):
-                # 合并块
-                prev = optimized[-1]
-                merged = ChunkInfo(
-                    index=i,
-                    start_line=prev.start_line,
-                    end_line=chunk.end_line,
-                    content=prev.content + "\n" + chunk.content,
-                    level=min(prev.level, chunk.level),
-                )
-                optimized[-1] = merged
-            else:
-                optimized.append(chunk)
-        
-        return optimized
-
-    def _should_merge(self, chunk1: ChunkInfo, chunk2: ChunkInfo) -> bool:
-        """检查是否应该合并两个块
+    @staticmethod
+    def _keep_line_ending(source: str, translated: str) -> str:
+        """使译文块末尾的换行与原文块一致
         
         Args:
-            chunk1: 第一个块
-            chunk2: 第二个块
+            source: 原文块
+            translated: 译文块
             
         Returns:
-            bool: 是否应该合并
+            str: 去掉末尾换行后接上原文块末尾换行的译文
         """
-        # 检查大小限制
-        total_size = len(chunk1.content) + len(chunk2.content) + 1
-        if total_size > self.config.max_chunk_size:
-            return False
-        
-        # 检查缩进级别
-        if abs(chunk1.level - chunk2.level) > 1:
-            return False
-        
-        # 检查是否有完整性标记
-        if not chunk1.is_complete or not chunk2.is_complete:
-            return True
-        
-        return False
+        content = source.rstrip(_LINE_BREAK_CHARS)
+        return translated.rstrip(_LINE_BREAK_CHARS) + source[len(content):]
 
-    def _add_context(self, chunks: List[ChunkInfo]) -> List[ChunkInfo]:
-        """添加上下文信息
+    def get_context(self, chunk_index: int) -> Optional[str]:
+        """获取块的上下文信息
         
         Args:
-            chunks: 分块信息列表
+            chunk_index: 块索引
             
         Returns:
-            List[ChunkInfo]: 添加上下文后的分块信息列表
+            Optional[str]: 上下文信息
         """
-        if not chunks:
-            return chunks
-        
-        # 清除上下文缓存
-        self._context_cache.clear()
-        
-        # 为每个块添加上下文
-        for i, chunk in enumerate(chunks):
-            context_lines = []
-            
-            # 添加前文上下文
-            if i > 0:
-                prev_chunk = chunks[i - 1]
-                context_lines.append(f"前文：\n{prev_chunk.content}")
-            
-            # 添加后文上下文
-            if i < len(chunks) - 1:
-                next_chunk = chunks[i + 1]
-                context_lines.append(f"后文：\n{next_chunk.content}")
-            
-            # 设置上下文
-            if context_lines:
-                context = "\n\n".join(context_lines)
-                chunk.context = context
-                self._context_cache[i] = context
-        
-        # 保存块信息
-        self._chunks = chunks
-        
-        return chunks 
\ No newline at end of file
+        # 上下文直接取自分块信息，不再另存一份
+        if 0 <= chunk_index < len(self._chunks):
+            return self._chunks[chunk_index].context
+        return None
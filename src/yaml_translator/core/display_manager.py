@@ -1,11 +1,13 @@
 """
 显示管理模块
 """
+import threading
 import time
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 
+from rich.cells import cell_len, set_cell_size
 from rich.console import Console
 from rich.layout import Layout
 from rich.live import Live
@@ -17,6 +19,19 @@ from rich.text import Text
 from ..config import DisplayConfig
 from ..utils import DisplayError, log
 
+# 进度变化小于该值时不更新显示
+_PROGRESS_STEP = 0.01
+
+# 纯文本任务列表的列：(标题, 显示宽度, 是否左对齐)
+_PLAIN_COLUMNS: Tuple[Tuple[str, int, bool], ...] = (
+    ("任务", 30, True),
+    ("状态", 10, True),
+    ("进度", 7, False),
+    ("Token", 10, False),
+    ("花费(USD)", 11, False),
+    ("用时", 6, False),
+)
+
 
 @dataclass
 class TaskInfo:
@@ -25,8 +40,8 @@ class TaskInfo:
     name: str  # 任务名称
     status: str  # 任务状态
     progress: float  # 进度(0-1)
-    start_time: float  # 开始时间戳
-    end_time: Optional[float] = None  # 结束时间戳
+    start_time: float  # 开始时间（time.monotonic）
+    end_time: Optional[float] = None  # 结束时间（time.monotonic）
     error: Optional[str] = None  # 错误信息
     tokens: int = 0  # 使用的token数
     cost: float = 0.0  # 花费
@@ -39,7 +54,7 @@ class SessionStats:
     completed_files: int = 0  # 完成文件数
     total_tokens: int = 0  # 总token数
     total_cost: float = 0.0  # 总花费
-    start_time: float = 0.0  # 开始时间戳
+    start_time: float = 0.0  # 开始时间（time.monotonic）
     errors: int = 0  # 错误数
 
 
@@ -76,12 +91,28 @@ class DisplayManager:
         self._tasks: Dict[str, TaskInfo] = {}
         self._current_task: Optional[str] = None
         
+        # 任务表格只创建一次，任务变化时只修改对应的行；
+        # 关闭 fancy_table 时改用固定列宽的纯文本行，渲染时无需测量每个单元格
+        self._body_table: Optional[Table] = (
+            self._create_task_table() if config.fancy_table else None
+        )
+        self._plain_rows: List[Text] = []
+        self._plain_cells: List[Tuple[str, ...]] = []  # 每行已格式化的各列内容
+        self._row_index: Dict[str, int] = {}
+        self._running: Set[str] = set()  # 未完成的任务，渲染时需要更新用时
+        
         # 会话统计
-        self._stats = SessionStats(start_time=time.time())
+        self._stats = SessionStats(start_time=time.monotonic())
         
         # 显示控制
         self._live: Optional[Live] = None
         self._is_running = False
+        
+        # 批量刷新：状态变化只标记为脏，由后台线程按刷新间隔统一渲染
+        self._lock = threading.RLock()
+        self._dirty = False
+        self._stop_event = threading.Event()
+        self._flush_thread: Optional[threading.Thread] = None
 
     def start(self) -> None:
         """启动显示"""
@@ -89,20 +120,38 @@ class DisplayManager:
             return
         
         self._is_running = True
+        # 不使用Live自带的刷新线程，只在刷新线程发现状态变化时重绘
+        # （refresh_rate 是以秒为单位的间隔，不是每秒刷新次数）
         self._live = Live(
             self.layout,
             console=self.console,
-            refresh_per_second=self.config.refresh_rate,
+            auto_refresh=False,
             transient=True,
         )
         self._live.start()
         self._update_display()
+        
+        # 启动刷新线程
+        self._stop_event.clear()
+        self._flush_thread = threading.Thread(
+            target=self._flush_loop,
+            name="display-flush",
+            daemon=True,
+        )
+        self._flush_thread.start()
 
     def stop(self) -> None:
         """停止显示"""
         if not self._is_running:
             return
         
+        # 停止刷新线程并渲染最后一次状态
+        self._stop_event.set()
+        if self._flush_thread:
+            self._flush_thread.join()
+            self._flush_thread = None
+        self._flush()
+        
         self._is_running = False
         if self._live:
             self._live.stop()
@@ -115,18 +164,31 @@ class DisplayManager:
             task_id: 任务ID
             name: 任务名称
         """
-        if task_id in self._tasks:
-            raise DisplayError(f"Task already exists: {task_id}")
-        
-        self._tasks[task_id] = TaskInfo(
-            id=task_id,
-            name=name,
-            status="等待中",
-            progress=0.0,
-            start_time=time.time(),
-        )
-        self._stats.total_files += 1
-        self._update_display()
+        with self._lock:
+            if task_id in self._tasks:
+                raise DisplayError(f"Task already exists: {task_id}")
+            
+            task = TaskInfo(
+                id=task_id,
+                name=name,
+                status="等待中",
+                progress=0.0,
+                start_time=time.monotonic(),
+            )
+            self._tasks[task_id] = task
+            self._stats.total_files += 1
+            
+            # 添加表格行
+            self._row_index[task_id] = len(self._row_index)
+            self._running.add(task_id)
+            cells = self._task_cells(task, task.start_time)
+            style = self._task_style(task)
+            if self._body_table is not None:
+                self._body_table.add_row(*cells, style=style)
+            else:
+                self._plain_cells.append(cells)
+                self._plain_rows.append(self._format_plain_row(cells, style))
+            self._dirty = True
 
     def update_task(
         self,
@@ -147,30 +209,50 @@ class DisplayManager:
             tokens: token数
             cost: 花费
         """
-        task = self._tasks.get(task_id)
-        if not task:
-            raise DisplayError(f"Task not found: {task_id}")
-        
-        if status:
-            task.status = status
-        if progress is not None:
-            task.progress = progress
-        if error:
-            task.error = error
-            self._stats.errors += 1
-        if tokens:
-            task.tokens = tokens
-            self._stats.total_tokens += tokens
-        if cost:
-            task.cost = cost
-            self._stats.total_cost += cost
-        
-        # 如果任务完成，更新统计
-        if progress == 1.0 and not task.end_time:
-            task.end_time = time.time()
-            self._stats.completed_files += 1
-        
-        self._update_display()
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if not task:
+                raise DisplayError(f"Task not found: {task_id}")
+            
+            # 记录是否有需要显示的变化，进度只在变化足够大或完成时更新
+            changed = False
+            if status and status != task.status:
+                task.status = status
+                changed = True
+            if progress is not None and (
+                abs(progress - task.progress) >= _PROGRESS_STEP
+                or (progress == 1.0 and task.progress != 1.0)
+            ):
+                task.progress = progress
+                changed = True
+            if error:
+                task.error = error
+                self._stats.errors += 1
+                changed = True
+            if tokens:
+                task.tokens = tokens
+                self._stats.total_tokens += tokens
+                changed = True
+            if cost:
+                task.cost = cost
+                self._stats.total_cost += cost
+                changed = True
+            
+            # 如果任务完成，更新统计
+            if progress == 1.0 and not task.end_time:
+                task.end_time = time.monotonic()
+                self._stats.completed_files += 1
+                self._running.discard(task_id)
+                changed = True
+            
+            if not changed:
+                return
+            
+            # 更新表格中对应的行
+            self._update_row(task)
+            
+            # 只标记需要刷新，渲染由刷新线程完成
+            self._dirty = True
 
     def set_current_task(self, task_id: Optional[str]) -> None:
         """设置当前任务
@@ -178,34 +260,65 @@ class DisplayManager:
         Args:
             task_id: 任务ID
         """
-        if task_id and task_id not in self._tasks:
-            raise DisplayError(f"Task not found: {task_id}")
-        
-        self._current_task = task_id
-        self._update_display()
+        with self._lock:
+            if task_id and task_id not in self._tasks:
+                raise DisplayError(f"Task not found: {task_id}")
+            
+            # 更新前后两个当前任务的行样式
+            previous = self._current_task
+            self._current_task = task_id
+            for changed in (previous, task_id):
+                if changed and changed in self._tasks:
+                    self._update_row(self._tasks[changed])
+            self._dirty = True
+
+    def _flush_loop(self) -> None:
+        """按刷新间隔渲染待更新的状态"""
+        while not self._stop_event.wait(self.config.refresh_rate):
+            self._flush()
+
+    def _flush(self) -> None:
+        """如果有状态变化则重新渲染"""
+        with self._lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+            self._update_display()
 
     def _update_display(self) -> None:
         """更新显示"""
         if not self._is_running or not self._live:
             return
         
+        with self._lock:
+            self._render_layout()
+            self._live.refresh()
+
+    def _render_layout(self) -> None:
+        """渲染所有区域"""
+        # 每次渲染只读取一次当前时间
+        now = time.monotonic()
+        
         # 更新头部
-        self.layout["header"].update(self._render_header())
+        self.layout["header"].update(self._render_header(now))
         
         # 更新主体
-        self.layout["body"].update(self._render_body())
+        self.layout["body"].update(self._render_body(now))
         
         # 更新底部
         self.layout["footer"].update(self._render_footer())
 
-    def _render_header(self) -> Panel:
+    def _render_header(self, now: float) -> Panel:
         """渲染头部
         
+        Args:
+            now: 当前时间（time.monotonic）
+            
         Returns:
             Panel: 头部面板
         """
         # 计算运行时间
-        elapsed = time.time() - self._stats.start_time
+        elapsed = now - self._stats.start_time
         hours = int(elapsed // 3600)
         minutes = int((elapsed % 3600) // 60)
         seconds = int(elapsed % 60)
@@ -233,13 +346,49 @@ class DisplayManager:
         
         return Panel(stats, title="会话信息", border_style="blue")
 
-    def _render_body(self) -> Panel:
+    def _render_body(self, now: float) -> Panel:
         """渲染主体
         
+        Args:
+            now: 当前时间（time.monotonic）
+            
         Returns:
             Panel: 主体面板
         """
-        # 创建任务表格
+        if self._body_table is None:
+            # 只有未完成任务的用时会变化，其余各列沿用已格式化的内容，用时变化时才重新生成该行
+            for task_id in self._running:
+                task = self._tasks[task_id]
+                index = self._row_index[task_id]
+                cells = self._plain_cells[index]
+                duration = self._format_duration(task, now)
+                if duration != cells[-1]:
+                    cells = cells[:-1] + (duration,)
+                    self._plain_cells[index] = cells
+                    self._plain_rows[index] = self._format_plain_row(cells, self._task_style(task))
+            
+            header = self._format_plain_row(
+                tuple(title for title, _, _ in _PLAIN_COLUMNS), "bold magenta"
+            )
+            body = Text("\n").join([header, *self._plain_rows])
+            body.no_wrap = True
+            return Panel(body, title="任务队列", border_style="blue")
+        
+        # 只需更新未完成任务的用时
+        duration_column = self._body_table.columns[-1]
+        for task_id in self._running:
+            task = self._tasks[task_id]
+            duration_column._cells[self._row_index[task_id]] = self._format_duration(task, now)
+        
+        return Panel(self._body_table, title="任务队列", border_style="blue")
+
+    @staticmethod
+    def _create_task_table() -> Table:
+        """创建任务表格
+        
+        Returns:
+            Table: 只包含表头的任务表格
+        """
         table = Table(
             show_header=True,
             header_style="bold magenta",
@@ -251,32 +400,98 @@ class DisplayManager:
         table.add_column("Token", justify="right")
         table.add_column("花费(USD)", justify="right")
         table.add_column("用时", justify="right")
+        return table
+
+    def _update_row(self, task: TaskInfo) -> None:
+        """用任务的最新状态替换表格中的对应行
+        
+        Args:
+            task: 任务信息
+        """
+        index = self._row_index[task.id]
+        cells = self._task_cells(task, time.monotonic())
+        style = self._task_style(task)
         
-        # 添加任务行
-        for task in self._tasks.values():
-            # 计算用时
-            duration = (task.end_time or time.time()) - task.start_time
-            duration_str = f"{int(duration)}s"
+        if self._body_table is None:
+            self._plain_cells[index] = cells
+            self._plain_rows[index] = self._format_plain_row(cells, style)
+            return
+        
+        for column, cell in zip(self._body_table.columns, cells):
+            column._cells[index] = cell
+        self._body_table.rows[index].style = style
+
+    @staticmethod
+    def _format_plain_row(cells: Tuple[str, ...], style: Optional[str]) -> Text:
+        """按固定列宽把各列内容格式化为一行文本
+        
+        Args:
+            cells: 各列内容
+            style: 行样式
             
-            # 设置行样式
-            style = None
-            if task.id == self._current_task:
-                style = "bold"
-            elif task.error:
-                style = "red"
+        Returns:
+            Text: 格式化后的行
+        """
+        parts = []
+        for cell, (_, width, left) in zip(cells, _PLAIN_COLUMNS):
+            padding = width - cell_len(cell)
+            if padding < 0:
+                # 超出列宽时截断
+                cell = set_cell_size(cell, width)
+            elif left:
+                cell = cell + " " * padding
+            else:
+                cell = " " * padding + cell
+            parts.append(cell)
+        return Text(" ".join(parts), style=style or "")
+
+    def _task_cells(self, task: TaskInfo, now: float) -> Tuple[str, ...]:
+        """生成任务在表格中的各列内容
+        
+        Args:
+            task: 任务信息
+            now: 当前时间（time.monotonic）
             
-            # 添加行
-            table.add_row(
-                task.name,
-                task.status,
-                f"{task.progress:.1%}",
-                f"{task.tokens:,}",
-                f"${task.cost:.4f}",
-                duration_str,
-                style=style,
-            )
+        Returns:
+            Tuple[str, ...]: 各列内容
+        """
+        return (
+            task.name,
+            task.status,
+            f"{task.progress:.1%}",
+            f"{task.tokens:,}",
+            f"${task.cost:.4f}",
+            self._format_duration(task, now),
+        )
+
+    def _task_style(self, task: TaskInfo) -> Optional[str]:
+        """获取任务行的样式
         
-        return Panel(table, title="任务队列", border_style="blue")
+        Args:
+            task: 任务信息
+            
+        Returns:
+            Optional[str]: 行样式
+        """
+        if task.id == self._current_task:
+            return "bold"
+        if task.error:
+            return "red"
+        return None
+
+    @staticmethod
+    def _format_duration(task: TaskInfo, now: float) -> str:
+        """格式化任务用时
+        
+        Args:
+            task: 任务信息
+            now: 当前时间（time.monotonic），任务未结束时用于计算用时
+            
+        Returns:
+            str: 用时字符串
+        """
+        duration = (task.end_time or now) - task.start_time
+        return f"{int(duration)}s"
 
     def _render_footer(self) -> Panel:
         """渲染底部
@@ -1,14 +1,18 @@
 """
 错误处理管理模块
 """
+import collections
+import functools
+import itertools
+import re
 import sys
 import traceback
 from dataclasses import dataclass
 from enum import Enum, auto
-from typing import Any, Callable, Dict, List, Optional, Type, Union
+from typing import Any, Callable, Deque, Dict, List, Optional, Type, Union
 
 from ..config import ErrorConfig
-from ..utils import log
+from ..utils import DATACLASS_OPTIONS, log
 
 
 class ErrorSeverity(Enum):
@@ -33,7 +37,66 @@ class ErrorCategory(Enum):
     UNKNOWN = auto()  # 未知错误
 
 
-@dataclass
+# 按优先级排列的 (错误类别, 异常类型名关键字, 错误消息关键字)
+_CATEGORY_KEYWORDS = (
+    (ErrorCategory.CONFIG, "config", "配置"),
+    (ErrorCategory.API, "api", "请求"),
+    (ErrorCategory.VALIDATION, "validation", "验证"),
+    (ErrorCategory.TRANSLATION, "translation", "翻译"),
+    (ErrorCategory.PROGRESS, "progress", "进度"),
+    (ErrorCategory.RECOVERY, "recovery", "恢复"),
+)
+
+# 所有消息关键字合并为一个正则，一次扫描错误消息
+_MESSAGE_KEYWORD_RE = re.compile("|".join(message for _, _, message in _CATEGORY_KEYWORDS))
+_MESSAGE_KEYWORD_PRIORITY = {
+    message: priority for priority, (_, _, message) in enumerate(_CATEGORY_KEYWORDS)
+}
+
+
+@functools.lru_cache(maxsize=256)
+def _type_keyword_priority(error_type: Type[BaseException]) -> int:
+    """根据异常类型名中的关键字获取类别优先级，同一类型只判断一次
+    
+    Args:
+        error_type: 异常类型
+        
+    Returns:
+        int: 匹配到的类别在 _CATEGORY_KEYWORDS 中的位置，未匹配时为其长度
+    """
+    name = error_type.__name__.lower()
+    for priority, (_, keyword, _) in enumerate(_CATEGORY_KEYWORDS):
+        if keyword in name:
+            return priority
+    return len(_CATEGORY_KEYWORDS)
+
+
+@functools.lru_cache(maxsize=256)
+def _categorize_by_type(error_type: Type[BaseException]) -> Optional[ErrorCategory]:
+    """只根据异常类型判断错误类别，同一类型只判断一次
+    
+    Args:
+        error_type: 异常类型
+        
+    Returns:
+        Optional[ErrorCategory]: 错误类别，无法只根据类型判断时返回None
+    """
+    # 系统错误
+    if issubclass(error_type, (OSError, SystemError)):
+        return ErrorCategory.SYSTEM
+    
+    # 文件错误
+    if issubclass(error_type, (IOError, FileNotFoundError)):
+        return ErrorCategory.FILE
+    
+    # 网络错误
+    if issubclass(error_type, (ConnectionError, TimeoutError)):
+        return ErrorCategory.NETWORK
+    
+    return None
+
+
+@dataclass(**DATACLASS_OPTIONS)
 class ErrorContext:
     """错误上下文"""
     error: Exception  # 原始错误
@@ -49,6 +112,26 @@ class ErrorContext:
 class ErrorHandler:
     """错误处理器"""
 
+    # 各类别错误的默认严重程度，未列出的类别为普通错误
+    _CATEGORY_SEVERITY: Dict[ErrorCategory, ErrorSeverity] = {
+        ErrorCategory.SYSTEM: ErrorSeverity.FATAL,  # 系统错误通常是致命的
+        ErrorCategory.CONFIG: ErrorSeverity.FATAL,  # 配置错误通常是致命的
+        ErrorCategory.NETWORK: ErrorSeverity.ERROR,  # 网络错误通常可以重试
+        ErrorCategory.API: ErrorSeverity.ERROR,  # API错误可能是临时的
+        ErrorCategory.VALIDATION: ErrorSeverity.ERROR,  # 验证错误需要修复
+        ErrorCategory.TRANSLATION: ErrorSeverity.ERROR,  # 翻译错误可以重试
+        ErrorCategory.PROGRESS: ErrorSeverity.WARNING,  # 进度错误通常不致命
+        ErrorCategory.RECOVERY: ErrorSeverity.ERROR,  # 恢复错误可能影响功能
+    }
+
+    # 各严重程度对应的日志函数
+    _SEVERITY_LOG: Dict[ErrorSeverity, Callable[[str], Any]] = {
+        ErrorSeverity.FATAL: log.critical,
+        ErrorSeverity.ERROR: log.error,
+        ErrorSeverity.WARNING: log.warning,
+        ErrorSeverity.INFO: log.info,
+    }
+
     def __init__(self, config: ErrorConfig):
         """初始化错误处理器
         
@@ -56,8 +139,9 @@ class ErrorHandler:
             config: 错误处理配置
         """
         self.config = config
-        self._error_handlers: Dict[ErrorCategory, List[Callable]] = {}
-        self._error_history: List[ErrorContext] = []
+        self._error_handlers: Dict[ErrorCategory, List[Callable]] = collections.defaultdict(list)
+        # 环形缓冲区，超过最大数量时自动丢弃最旧的记录
+        self._error_history: Deque[ErrorContext] = collections.deque(maxlen=config.max_history)
         
         # 注册默认处理器
         self._register_default_handlers()
@@ -91,6 +175,12 @@ class ErrorHandler:
             if severity is None:
                 severity = self._determine_severity(error, category)
             
+            # 格式化堆栈需要遍历所有帧，只在会记录或是致命错误时才生成
+            if self.config.log_traceback or severity == ErrorSeverity.FATAL:
+                formatted_traceback = traceback.format_exc()
+            else:
+                formatted_traceback = None
+            
             # 创建错误上下文
             context = ErrorContext(
                 error=error,
@@ -99,22 +189,20 @@ class ErrorHandler:
                 message=str(error),
                 details=self._get_error_details(error),
                 source=source,
-                traceback=traceback.format_exc(),
+                traceback=formatted_traceback,
                 data=data,
             )
             
             # 记录错误历史
             if self.config.keep_history:
                 self._error_history.append(context)
-                if len(self._error_history) > self.config.max_history:
-                    self._error_history.pop(0)
             
             # 记录日志
             self._log_error(context)
             
-            # 调用对应的处理器
+            # 调用对应的处理器（用get查找，避免为没有处理器的类别插入空列表）
             handled = False
-            for handler in self._error_handlers.get(category, []):
+            for handler in self._error_handlers.get(category, ()):
                 try:
                     if handler(context):
                         handled = True
@@ -143,8 +231,6 @@ class ErrorHandler:
             category: 错误类别
             handler: 处理函数，接收ErrorContext参数，返回是否处理成功
         """
-        if category not in self._error_handlers:
-            self._error_handlers[category] = []
         self._error_handlers[category].append(handler)
 
     def get_error_history(
@@ -163,18 +249,27 @@ class ErrorHandler:
         Returns:
             List[ErrorContext]: 错误历史列表
         """
-        result = self._error_history
-        
-        if category:
-            result = [e for e in result if e.category == category]
-        
-        if severity:
-            result = [e for e in result if e.severity == severity]
-        
-        if limit:
-            result = result[-limit:]
-        
-        return result
+        if not category and not severity:
+            if not limit:
+                return list(self._error_history)
+            
+            # 不过滤时只复制最后limit条
+            recent = list(itertools.islice(reversed(self._error_history), limit))
+            recent.reverse()
+            return recent
+        
+        matches = (
+            e for e in (reversed(self._error_history) if limit else self._error_history)
+            if (not category or e.category is category)
+            and (not severity or e.severity is severity)
+        )
+        if not limit:
+            return list(matches)
+        
+        # 从最新的记录向前查找，找到limit条后立即停止
+        recent = list(itertools.islice(matches, limit))
+        recent.reverse()
+        return recent
 
     def clear_history(self) -> None:
         """清除错误历史"""
@@ -265,44 +360,20 @@ class ErrorHandler:
         Returns:
             ErrorCategory: 错误类别
         """
-        error_type = type(error).__name__.lower()
-        error_str = str(error).lower()
+        # 先按异常类型判断（结果按类型缓存）
+        category = _categorize_by_type(type(error))
+        if category is not None:
+            return category
         
-        # 系统错误
-        if isinstance(error, (OSError, SystemError)):
-            return ErrorCategory.SYSTEM
+        # 类型名关键字和消息关键字中优先级最高的类别（配置、API、验证、翻译、进度、恢复）
+        priority = _type_keyword_priority(type(error))
+        for match in _MESSAGE_KEYWORD_RE.finditer(str(error)):
+            priority = min(priority, _MESSAGE_KEYWORD_PRIORITY[match.group()])
+            if priority == 0:
+                break
         
-        # 配置错误
-        if "config" in error_type or "配置" in error_str:
-            return ErrorCategory.CONFIG
-        
-        # 文件错误
-        if isinstance(error, (IOError, FileNotFoundError)):
-            return ErrorCategory.FILE
-        
-        # 网络错误
-        if isinstance(error, (ConnectionError, TimeoutError)):
-            return ErrorCategory.NETWORK
-        
-        # API错误
-        if "api" in error_type or "请求" in error_str:
-            return ErrorCategory.API
-        
-        # 验证错误
-        if "validation" in error_type or "验证" in error_str:
-            return ErrorCategory.VALIDATION
-        
-        # 翻译错误
-        if "translation" in error_type or "翻译" in error_str:
-            return ErrorCategory.TRANSLATION
-        
-        # 进度错误
-        if "progress" in error_type or "进度" in error_str:
-            return ErrorCategory.PROGRESS
-        
-        # 恢复错误
-        if "recovery" in error_type or "恢复" in error_str:
-            return ErrorCategory.RECOVERY
+        if priority < len(_CATEGORY_KEYWORDS):
+            return _CATEGORY_KEYWORDS[priority][0]
         
         return ErrorCategory.UNKNOWN
 
@@ -320,39 +391,7 @@ class ErrorHandler:
         Returns:
             ErrorSeverity: 错误严重程度
         """
-        # 系统错误通常是致命的
-        if category == ErrorCategory.SYSTEM:
-            return ErrorSeverity.FATAL
-        
-        # 配置错误通常是致命的
-        if category == ErrorCategory.CONFIG:
-            return ErrorSeverity.FATAL
-        
-        # 网络错误通常可以重试
-        if category == ErrorCategory.NETWORK:
-            return ErrorSeverity.ERROR
-        
-        # API错误可能是临时的
-        if category == ErrorCategory.API:
-            return ErrorSeverity.ERROR
-        
-        # 验证错误需要修复
-        if category == ErrorCategory.VALIDATION:
-            return ErrorSeverity.ERROR
-        
-        # 翻译错误可以重试
-        if category == ErrorCategory.TRANSLATION:
-            return ErrorSeverity.ERROR
-        
-        # 进度错误通常不致命
-        if category == ErrorCategory.PROGRESS:
-            return ErrorSeverity.WARNING
-        
-        # 恢复错误可能影响功能
-        if category == ErrorCategory.RECOVERY:
-            return ErrorSeverity.ERROR
-        
-        return ErrorSeverity.ERROR
+        return self._CATEGORY_SEVERITY.get(category, ErrorSeverity.ERROR)
 
     def _get_error_details(self, error: Exception) -> Optional[str]:
         """获取错误的详细信息
@@ -378,14 +417,7 @@ class ErrorHandler:
             context: 错误上下文
         """
         # 根据严重程度选择日志级别
-        if context.severity == ErrorSeverity.FATAL:
-            log_func = log.critical
-        elif context.severity == ErrorSeverity.ERROR:
-            log_func = log.error
-        elif context.severity == ErrorSeverity.WARNING:
-            log_func = log.warning
-        else:
-            log_func = log.info
+        log_func = self._SEVERITY_LOG[context.severity]
         
         # 记录基本信息
         log_func(f"[{context.category.name}] {context.message}")
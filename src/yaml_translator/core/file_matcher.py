@@ -2,8 +2,10 @@
 文件匹配模块
 """
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Generator, List, Optional, Set, Union
+from typing import Dict, Generator, List, Optional, Pattern, Set, Tuple, Union
 
 from pathspec import PathSpec
 from pathspec.patterns import GitWildMatchPattern
@@ -12,6 +14,36 @@ from ..config import FileMatchingConfig
 from ..utils import FileError, log
 from .yaml_handler import YAMLHandler
 
+# YAML文件扩展名
+_YAML_SUFFIXES = (".yml", ".yaml")
+
+# 并行遍历目录的线程数，目录遍历受I/O限制，线程数可以多于CPU核数
+SCAN_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+
+def _fuse_patterns(spec: PathSpec) -> Optional[Pattern]:
+    """将PathSpec中的所有模式合并为一个正则表达式
+    
+    Args:
+        spec: PathSpec对象
+        
+    Returns:
+        Optional[Pattern]: 合并后的正则表达式；如果包含否定模式（!pattern）则返回None，
+            此时需要使用PathSpec按顺序匹配
+    """
+    regexes = []
+    for pattern in spec.patterns:
+        if pattern.include is None:
+            continue
+        if not pattern.include:
+            return None
+        # 去掉命名分组，避免合并后组名重复
+        regexes.append(pattern.regex.pattern.replace("(?P<ps_d>", "(?:"))
+    
+    if not regexes:
+        return re.compile(r"(?!)")
+    return re.compile("|".join(f"(?:{r})" for r in regexes))
+
 
 class FileMatcher:
     """文件匹配器"""
@@ -30,12 +62,22 @@ class FileMatcher:
         self._include_spec = PathSpec.from_lines(GitWildMatchPattern, config.include_patterns)
         self._exclude_spec = PathSpec.from_lines(GitWildMatchPattern, config.exclude_patterns)
         
+        # 合并为单个正则，每个文件只需匹配一次
+        self._include_re = _fuse_patterns(self._include_spec)
+        self._exclude_re = _fuse_patterns(self._exclude_spec)
+        
         # 转换排除目录为集合，提高查找效率
-        self._exclude_dirs = set(config.exclude_dirs)
+        self._exclude_dirs = frozenset(config.exclude_dirs)
+        
+        # 文件检查结果缓存，同一路径多次检查时直接返回
+        self._valid_cache: Dict[Path, bool] = {}
 
     def find_yaml_files(self, path: Union[str, Path], recursive: bool = True) -> Generator[Path, None, None]:
         """查找YAML文件
         
+        目录按层（广度优先）遍历：先返回当前层所有目录中的文件，再进入下一层；
+        同一层内按目录的扫描顺序返回。
+        
         Args:
             path: 要搜索的路径
             recursive: 是否递归搜索子目录
@@ -56,28 +98,86 @@ class FileMatcher:
                     yield root_path
                 return
 
-            # 遍历目录
-            for current_path, dirs, files in os.walk(root_path):
-                # 从dirs列表中移除被排除的目录，这样os.walk就不会进入这些目录
-                dirs[:] = [d for d in dirs if d not in self._exclude_dirs]
-                
-                # 如果不递归，清空dirs列表
-                if not recursive:
-                    dirs.clear()
-                
-                current = Path(current_path)
-                
-                # 检查并生成匹配的文件
-                for file in files:
-                    file_path = current / file
-                    if self._is_valid_file(file_path):
-                        yield file_path
+            # 按层遍历目录：同一层有多个目录时交给线程池并行扫描，结果按目录顺序返回
+            level = [str(root_path)]
+            while level:
+                next_level: List[str] = []
+                for files, subdirs in self._scan_level(level):
+                    yield from files
+                    next_level.extend(subdirs)
+                level = next_level if recursive else []
 
         except Exception as e:
             log.error(f"Error while finding YAML files in {path}: {str(e)}")
             raise FileError(f"Error while finding YAML files in {path}", details=str(e))
 
+    def _scan_level(self, level: List[str]) -> List[Tuple[List[Path], List[str]]]:
+        """扫描同一层的所有目录
+        
+        Args:
+            level: 同一层的目录路径列表
+            
+        Returns:
+            List[Tuple[List[Path], List[str]]]: 每个目录的扫描结果，与输入顺序一致
+        """
+        # 只有一个目录时直接扫描，避免创建线程池
+        if len(level) == 1:
+            return [self._scan_dir(level[0])]
+        
+        # 线程数不超过本层目录数
+        with ThreadPoolExecutor(max_workers=min(SCAN_WORKERS, len(level))) as executor:
+            return list(executor.map(self._scan_dir, level))
+
+    def _scan_dir(self, dir_path: str) -> Tuple[List[Path], List[str]]:
+        """扫描单个目录，在线程池中执行
+        
+        Args:
+            dir_path: 目录路径
+            
+        Returns:
+            Tuple[List[Path], List[str]]: (匹配的YAML文件, 未排除的子目录)，
+            目录无法访问时返回两个空列表
+        """
+        files: List[Path] = []
+        subdirs: List[str] = []
+        try:
+            with os.scandir(dir_path) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        # 排除的目录不会进入
+                        if entry.name not in self._exclude_dirs:
+                            subdirs.append(entry.path)
+                    elif entry.is_file() and entry.name.lower().endswith(_YAML_SUFFIXES):
+                        # 只为YAML扩展名的文件创建Path对象
+                        file_path = Path(entry.path)
+                        if self._is_valid_file(file_path):
+                            files.append(file_path)
+        except OSError as e:
+            # 单个目录无法访问（权限不足、扫描期间被删除等）时跳过，不中断整个遍历
+            log.warning(f"Cannot scan directory {dir_path}: {str(e)}")
+            return [], []
+        return files, subdirs
+
+    def clear_cache(self) -> None:
+        """清除文件检查结果缓存，文件发生变化后调用"""
+        self._valid_cache.clear()
+
     def _is_valid_file(self, file_path: Path) -> bool:
+        """检查文件是否是有效的YAML文件，结果按路径缓存
+        
+        Args:
+            file_path: 文件路径
+            
+        Returns:
+            bool: 是否是有效的YAML文件
+        """
+        valid = self._valid_cache.get(file_path)
+        if valid is None:
+            valid = self._check_file(file_path)
+            self._valid_cache[file_path] = valid
+        return valid
+
+    def _check_file(self, file_path: Path) -> bool:
         """检查文件是否是有效的YAML文件
         
         Args:
@@ -87,25 +187,45 @@ class FileMatcher:
             bool: 是否是有效的YAML文件
         """
         try:
-            # 获取相对路径用于模式匹配
-            rel_path = str(file_path.relative_to(file_path.parent))
+            # 按开销从小到大检查，尽早排除：
+            # 1. 扩展名是YAML
+            if file_path.suffix.lower() not in _YAML_SUFFIXES:
+                return False
+            
+            # 2. 父目录不在排除列表中
+            if not self._exclude_dirs.isdisjoint(file_path.parts):
+                return False
+            
+            # 3. 匹配包含模式且不匹配排除模式（按文件名匹配）
+            rel_path = file_path.name
+            if not self._match(self._include_spec, self._include_re, rel_path):
+                return False
+            if self._match(self._exclude_spec, self._exclude_re, rel_path):
+                return False
             
-            # 检查文件是否满足所有条件：
-            # 1. 是YAML文件（通过yaml_handler检查）
-            # 2. 匹配包含模式
-            # 3. 不匹配排除模式
-            # 4. 父目录不在排除列表中
-            return (
-                self.yaml_handler.is_yaml_file(file_path) and
-                self._include_spec.match_file(rel_path) and
-                not self._exclude_spec.match_file(rel_path) and
-                not any(part in self._exclude_dirs for part in file_path.parts)
-            )
+            # 4. 是YAML文件（通过yaml_handler检查，需要读取文件状态）
+            return self.yaml_handler.is_yaml_file(file_path)
             
         except Exception as e:
             log.warning(f"Error checking file {file_path}: {str(e)}")
             return False
 
+    @staticmethod
+    def _match(spec: PathSpec, regex: Optional[Pattern], path: str) -> bool:
+        """检查路径是否匹配模式
+        
+        Args:
+            spec: PathSpec对象
+            regex: 合并后的正则表达式，为None时使用PathSpec匹配
+            path: 要检查的路径
+            
+        Returns:
+            bool: 是否匹配
+        """
+        if regex is None:
+            return spec.match_file(path)
+        return regex.match(path) is not None
+
     def filter_files(self, files: List[Union[str, Path]]) -> List[Path]:
         """过滤文件列表，只保留匹配的YAML文件
         
@@ -2,20 +2,51 @@
 OpenAI API 客户端模块
 """
 import asyncio
+import functools
 import json
+import re
 import time
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import aiohttp
 import backoff
 from pydantic import BaseModel
 
-from ..config import APIConfig
-from ..utils import APIError, RateLimitError, log
+from ..config import APIConfig, CacheConfig
+from ..utils import DATACLASS_OPTIONS, APIError, RateLimitError, dumps_json, loads_json, log
+from .translation_cache import TranslationCache
 
+# 连接池设置：总连接数上限、DNS缓存时间（秒）和空闲连接保持时间（秒）
+_CONNECTION_LIMIT = 100
+_DNS_CACHE_TTL = 600
+_KEEPALIVE_TIMEOUT = 75
 
-@dataclass
+# 各模型每1K token的价格（美元）：(提示词, 补全)，按模型名前缀匹配
+_PRICING: Dict[str, Tuple[float, float]] = {
+    "gpt-3.5-turbo": (0.0015, 0.002),
+    "gpt-4": (0.03, 0.06),
+    "gpt-4-32k": (0.06, 0.12),
+    "gpt-4-turbo": (0.01, 0.03),
+    "gpt-4o": (0.005, 0.015),
+    "gpt-4o-mini": (0.00015, 0.0006),
+}
+# 未知模型按gpt-3.5-turbo计价
+_DEFAULT_PRICING = _PRICING["gpt-3.5-turbo"]
+
+# 批量翻译时各段文本之间的分隔行
+_BATCH_SEPARATOR = "\n---\n"
+_BATCH_SPLIT_RE = re.compile(r"^---[ \t]*$", re.MULTILINE)
+_BATCH_INDEX_RE = re.compile(r"^\s*\[(\d+)\][ \t]?")
+
+# 批量翻译时追加到系统提示词后的格式说明
+_BATCH_INSTRUCTION = (
+    "\n\n输入包含多段以单独一行 --- 分隔的文本，每段以 [序号] 开头。"
+    "请分别翻译每一段，保留每段开头的 [序号] 和段与段之间的 --- 分隔行，"
+    "按原顺序输出，不要合并、拆分或省略任何一段。"
+)
+
+@dataclass(**DATACLASS_OPTIONS)
 class APIUsage:
     """API 使用情况"""
     prompt_tokens: int  # 提示词使用的token数
@@ -30,49 +61,118 @@ class ChatMessage(BaseModel):
     content: str  # 消息内容
 
 
-class ChatResponse(BaseModel):
-    """聊天响应"""
-    id: str  # 响应ID
-    choices: List[Dict[str, Any]]  # 响应选项列表
-    usage: Dict[str, int]  # 使用情况
-    created: int  # 创建时间戳
-
-
 class OpenAIClient:
     """OpenAI API 客户端"""
 
-    def __init__(self, config: APIConfig):
+    def __init__(
+        self,
+        config: APIConfig,
+        cache_config: Optional[CacheConfig] = None,
+        session: Optional[aiohttp.ClientSession] = None,
+    ):
         """初始化 OpenAI API 客户端
         
         Args:
             config: API配置
+            cache_config: 翻译缓存配置，为None时不缓存
+            session: 外部传入的会话，多个客户端可共享同一连接池，由调用方负责关闭
         """
         self.config = config
-        self._session: Optional[aiohttp.ClientSession] = None
-        self._last_request_time = 0.0
-        self._request_count = 0
-        self._total_tokens = 0
+        self._session: Optional[aiohttp.ClientSession] = session
+        self._owns_session = session is None
+        self._prompt_tokens = 0
+        self._completion_tokens = 0
+        
+        # 令牌桶速率限制：桶容量为每分钟请求数，按时间匀速补充
+        self._tokens = float(config.rate_limit)
+        self._tokens_per_sec = config.rate_limit / 60.0
+        self._last_refill = time.monotonic()
+        self._rate_lock = asyncio.Lock()
+        
+        # 初始化翻译缓存，相同的文本和提示词只请求一次
+        self._cache: Optional[TranslationCache] = None
+        if cache_config is not None and cache_config.enabled:
+            self._cache = TranslationCache(cache_config)
         
         # 初始化请求头
         self._headers = {
             "Content-Type": "application/json",
             "Authorization": f"Bearer {config.key}",
         }
+        
+        # 请求体中不变的字段预先序列化，发送时只需序列化消息列表再拼接
+        request_base = {
+            "model": config.model,
+            "temperature": config.temperature,
+            "max_tokens": config.max_tokens,
+        }
+        self._body_prefix = dumps_json(request_base, compact=True)[:-1] + b',"messages":'
 
     async def __aenter__(self):
         """异步上下文管理器入口"""
-        if not self._session:
-            self._session = aiohttp.ClientSession(
-                base_url=self.config.endpoint,
-                headers=self._headers,
-            )
+        self._get_session()
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """异步上下文管理器出口"""
-        if self._session:
+        await self.close()
+
+    async def close(self) -> None:
+        """关闭客户端，释放自己创建的会话和缓存
+        
+        外部传入的会话由调用方关闭。不使用 async with 时，用完客户端后应调用此方法。
+        """
+        if self._session is not None and self._owns_session:
             await self._session.close()
             self._session = None
+        if self._cache is not None:
+            self._cache.close()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """获取会话，首次使用时创建
+        
+        会话在客户端的整个生命周期内复用，连接池保持与API的长连接，
+        避免重复建立TCP和TLS连接。
+        
+        Returns:
+            aiohttp.ClientSession: HTTP会话
+        """
+        if self._session is None:
+            connector = aiohttp.TCPConnector(
+                limit=_CONNECTION_LIMIT,
+                ttl_dns_cache=_DNS_CACHE_TTL,
+                keepalive_timeout=_KEEPALIVE_TIMEOUT,
+            )
+            self._session = aiohttp.ClientSession(
+                base_url=self.config.endpoint,
+                headers=self._headers,
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.config.timeout),
+            )
+            self._owns_session = True
+        return self._session
+
+    async def translate(self, text: str, system_prompt: str) -> str:
+        """翻译文本
+        
+        Args:
+            text: 要翻译的文本
+            system_prompt: 系统提示词
+            
+        Returns:
+            str: 翻译后的文本
+            
+        Raises:
+            APIError: API调用错误
+            RateLimitError: 达到速率限制
+        """
+        if self._cache is None:
+            return await self._translate(text, system_prompt)
+        
+        key = TranslationCache.make_key(self.config.model, system_prompt, text)
+        return await self._cache.get_or_compute(
+            key, lambda: self._translate(text, system_prompt)
+        )
 
     @backoff.on_exception(
         backoff.expo,
@@ -80,8 +180,8 @@ class OpenAIClient:
         max_tries=3,
         max_time=30,
     )
-    async def translate(self, text: str, system_prompt: str) -> str:
-        """翻译文本
+    async def _translate(self, text: str, system_prompt: str) -> str:
+        """调用API翻译文本，不经过缓存
         
         Args:
             text: 要翻译的文本
@@ -95,25 +195,26 @@ class OpenAIClient:
             RateLimitError: 达到速率限制
         """
         try:
-            # 构建消息列表
+            # 构建消息列表（内容由程序生成，直接使用字典，无需模型校验）
             messages = [
-                ChatMessage(role="system", content=system_prompt),
-                ChatMessage(role="user", content=text),
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": text},
             ]
             
             # 调用API
             response = await self._chat_completion(messages)
             
             # 提取翻译结果
-            if not response.choices:
+            choices = response.get("choices")
+            if not choices:
                 raise APIError("Empty response from API")
             
-            translated_text = response.choices[0].get("message", {}).get("content", "")
+            translated_text = choices[0].get("message", {}).get("content", "")
             if not translated_text:
                 raise APIError("No translation in response")
             
             # 更新统计信息
-            self._update_stats(response.usage)
+            self._update_stats(response.get("usage") or {})
             
             return translated_text
             
@@ -124,40 +225,121 @@ class OpenAIClient:
             log.error(f"Translation failed: {str(e)}")
             raise APIError("Translation failed", details=str(e))
 
-    async def _chat_completion(self, messages: List[ChatMessage]) -> ChatResponse:
+    async def translate_many(
+        self,
+        texts: List[str],
+        system_prompt: str,
+        batch_size: int = 8,
+        max_concurrent: int = 3,
+    ) -> List[str]:
+        """批量翻译文本
+        
+        每 batch_size 段文本合并为一个请求，多个请求并发发送，用一次往返的延迟翻译多段文本。
+        模型返回的段数或序号不符时，该组退回为逐段翻译。缓存按单段文本保存，
+        批量请求的原始响应不写入缓存。
+        
+        Args:
+            texts: 要翻译的文本列表
+            system_prompt: 系统提示词
+            batch_size: 每个请求合并的文本数
+            max_concurrent: 同时进行的最大请求数
+            
+        Returns:
+            List[str]: 翻译后的文本，顺序与输入一致
+            
+        Raises:
+            APIError: API调用错误
+            RateLimitError: 达到速率限制
+        """
+        batch_size = max(1, batch_size)
+        batch_prompt = system_prompt + _BATCH_INSTRUCTION
+        semaphore = asyncio.Semaphore(max(1, max_concurrent))
+        
+        async def translate_group(group: List[str]) -> List[str]:
+            async with semaphore:
+                # 单段文本或文本本身含有分隔行时无法可靠拆分，逐段翻译
+                if len(group) == 1 or any(_BATCH_SPLIT_RE.search(text) for text in group):
+                    return [await self.translate(text, system_prompt) for text in group]
+                
+                content = _BATCH_SEPARATOR.join(
+                    f"[{i}] {text}" for i, text in enumerate(group)
+                )
+                translated = self._split_batch(
+                    await self._translate(content, batch_prompt), len(group)
+                )
+                if translated is not None:
+                    # 拆分成功后按单段文本写入缓存，与逐段翻译共用缓存键
+                    if self._cache is not None:
+                        for text, translated_text in zip(group, translated):
+                            key = TranslationCache.make_key(self.config.model, system_prompt, text)
+                            self._cache.set(key, translated_text)
+                    return translated
+                
+                log.warning(f"Batch response could not be split, translating {len(group)} texts one by one")
+                return [await self.translate(text, system_prompt) for text in group]
+        
+        groups = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+        results = await asyncio.gather(*(translate_group(group) for group in groups))
+        return [text for group in results for text in group]
+
+    @staticmethod
+    def _split_batch(response: str, count: int) -> Optional[List[str]]:
+        """拆分批量翻译的响应
+        
+        Args:
+            response: 模型返回的文本
+            count: 期望的段数
+            
+        Returns:
+            Optional[List[str]]: 按序号排列的译文，段数或序号不符时返回None
+        """
+        parts = _BATCH_SPLIT_RE.split(response)
+        if len(parts) != count:
+            return None
+        
+        translated: List[Optional[str]] = [None] * count
+        last = count - 1
+        for i, part in enumerate(parts):
+            # 只去掉分隔行两侧的一个换行符，译文自身的首尾换行保持不变
+            if i > 0 and part.startswith("\n"):
+                part = part[1:]
+            if i < last and part.endswith("\n"):
+                part = part[:-1]
+            match = _BATCH_INDEX_RE.match(part)
+            if match is None:
+                return None
+            index = int(match.group(1))
+            if index >= count or translated[index] is not None:
+                return None
+            translated[index] = part[match.end():]
+        return translated
+
+    async def _chat_completion(self, messages: List[Dict[str, str]]) -> Dict[str, Any]:
         """调用聊天补全API
         
+        响应来自可信的API，直接返回解析后的字典，不做模型校验。
+        
         Args:
             messages: 消息列表
             
         Returns:
-            ChatResponse: API响应
+            Dict[str, Any]: API响应
             
         Raises:
             APIError: API调用错误
             RateLimitError: 达到速率限制
         """
-        if not self._session:
-            raise APIError("Client session not initialized")
+        session = self._get_session()
         
         # 检查并等待速率限制
         await self._wait_for_rate_limit()
         
         try:
-            # 准备请求数据
-            data = {
-                "model": self.config.model,
-                "messages": [msg.dict() for msg in messages],
-                "temperature": self.config.temperature,
-                "max_tokens": self.config.max_tokens,
-            }
-            
-            # 发送请求
-            async with self._session.post("/v1/chat/completions", json=data) as response:
-                # 更新请求计数和时间
-                self._request_count += 1
-                self._last_request_time = time.time()
-                
+            # 准备请求数据：预先序列化的固定字段拼接消息列表
+            body = self._body_prefix + dumps_json(messages, compact=True) + b"}"
+            
+            # 发送请求（Content-Type已在会话请求头中设置）
+            async with session.post("/v1/chat/completions", data=body) as response:
                 # 检查响应状态
                 if response.status == 429:
                     raise RateLimitError("API rate limit exceeded")
@@ -165,9 +347,8 @@ class OpenAIClient:
                     error_data = await response.text()
                     raise APIError(f"API request failed with status {response.status}", details=error_data)
                 
-                # 解析响应
-                response_data = await response.json()
-                return ChatResponse(**response_data)
+                # 解析响应（安装了orjson时使用orjson解析）
+                return await response.json(loads=loads_json)
                 
         except aiohttp.ClientError as e:
             log.error(f"API request failed: {str(e)}")
@@ -182,20 +363,28 @@ class OpenAIClient:
     async def _wait_for_rate_limit(self) -> None:
         """等待速率限制
         
-        根据配置的速率限制计算等待时间
+        使用令牌桶算法：每个请求消耗一个令牌，令牌不足时预支并等待补足。
+        加锁只保护令牌计算，等待在锁外进行，并发请求按预支顺序依次放行。
         """
-        if self._request_count >= self.config.rate_limit:
-            # 计算距离上次请求的时间
-            elapsed = time.time() - self._last_request_time
-            
-            # 如果时间不足1分钟，则等待
-            if elapsed < 60:
-                wait_time = 60 - elapsed
-                log.debug(f"Rate limit reached, waiting for {wait_time:.2f} seconds")
-                await asyncio.sleep(wait_time)
+        if self._tokens_per_sec <= 0:
+            return
+        
+        async with self._rate_lock:
+            # 按经过的时间补充令牌
+            now = time.monotonic()
+            self._tokens = min(
+                float(self.config.rate_limit),
+                self._tokens + (now - self._last_refill) * self._tokens_per_sec,
+            )
+            self._last_refill = now
             
-            # 重置计数器
-            self._request_count = 0
+            # 消耗一个令牌，不足时余额为负，需等待补足
+            self._tokens -= 1
+            wait_time = -self._tokens / self._tokens_per_sec if self._tokens < 0 else 0.0
+        
+        if wait_time > 0:
+            log.debug(f"Rate limit reached, waiting for {wait_time:.2f} seconds")
+            await asyncio.sleep(wait_time)
 
     def _update_stats(self, usage: Dict[str, int]) -> None:
         """更新API使用统计
@@ -203,7 +392,8 @@ class OpenAIClient:
         Args:
             usage: API使用情况
         """
-        self._total_tokens += usage.get("total_tokens", 0)
+        self._prompt_tokens += usage.get("prompt_tokens", 0)
+        self._completion_tokens += usage.get("completion_tokens", 0)
 
     def get_usage(self) -> APIUsage:
         """获取API使用情况
@@ -212,21 +402,41 @@ class OpenAIClient:
             APIUsage: API使用统计
         """
         return APIUsage(
-            prompt_tokens=0,  # TODO: 实现详细统计
-            completion_tokens=0,  # TODO: 实现详细统计
-            total_tokens=self._total_tokens,
-            estimated_cost=self._calculate_cost(self._total_tokens),
+            prompt_tokens=self._prompt_tokens,
+            completion_tokens=self._completion_tokens,
+            total_tokens=self._prompt_tokens + self._completion_tokens,
+            estimated_cost=self._calculate_cost(
+                self.config.model, self._prompt_tokens, self._completion_tokens
+            ),
         )
 
     @staticmethod
-    def _calculate_cost(tokens: int) -> float:
+    @functools.lru_cache(maxsize=16)
+    def _model_pricing(model: str) -> Tuple[float, float]:
+        """查找模型的价格
+        
+        Args:
+            model: 模型名
+            
+        Returns:
+            Tuple[float, float]: 每1K提示词和补全token的价格（美元），取最长匹配的前缀
+        """
+        matches = [prefix for prefix in _PRICING if model.startswith(prefix)]
+        if not matches:
+            return _DEFAULT_PRICING
+        return _PRICING[max(matches, key=len)]
+
+    @classmethod
+    def _calculate_cost(cls, model: str, prompt_tokens: int, completion_tokens: int) -> float:
         """计算API使用成本
         
         Args:
-            tokens: 使用的token数
+            model: 模型名
+            prompt_tokens: 提示词使用的token数
+            completion_tokens: 补全使用的token数
             
         Returns:
             float: 成本（美元）
         """
-        # 使用GPT-3.5-turbo的价格：$0.002 per 1K tokens
-        return (tokens / 1000) * 0.002 
\ No newline at end of file
+        prompt_price, completion_price = cls._model_pricing(model)
+        return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1000
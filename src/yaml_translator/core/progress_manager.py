@@ -1,18 +1,26 @@
 """
 进度管理模块
 """
-import json
+import atexit
+import os
+import queue
+import shutil
+import tempfile
+import threading
 import time
-from dataclasses import asdict, dataclass
+from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
 from pathlib import Path
-from typing import Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import pytz
 
 from ..config import ProgressConfig
-from ..utils import ProgressError, log
+from ..utils import ProgressError, dumps_json, iter_json_object, loads_json, log
+
+# 每个token的成本（美元），按GPT-3.5-turbo的价格$0.002 per 1K tokens计算
+_COST_PER_TOKEN = 0.002 / 1000
 
 
 class TaskStatus(str, Enum):
@@ -64,9 +72,10 @@ class ProgressManager:
         self._save_path.mkdir(parents=True, exist_ok=True)
         
         # 初始化会话信息
+        now = time.time()
         self._session = SessionInfo(
-            start_time=time.time(),
-            last_update=time.time(),
+            start_time=now,
+            last_update=now,
             total_files=0,
             completed_files=0,
             total_tokens=0,
@@ -77,9 +86,27 @@ class ProgressManager:
         # 初始化文件进度字典
         self._files: Dict[str, FileProgress] = {}
         
+        # 按状态索引文件路径（字典用作有序集合），查询某种状态的文件时无需遍历所有文件；
+        # _order 记录文件加入的顺序，合并多个状态时按此排序
+        self._by_status: Dict[TaskStatus, Dict[str, None]] = {status: {} for status in TaskStatus}
+        self._order: Dict[str, int] = {}
+        
+        # 进度有变化且距上次保存超过间隔时才保存
+        self._dirty = False
+        self._last_save = time.monotonic()
+        
+        # 后台写入线程：前台只提交进度快照，队列中只保留最新的一份
+        self._save_queue: "queue.Queue[Tuple[Dict[str, Any], List[Tuple[str, Dict[str, Any]]], str]]" = (
+            queue.Queue(maxsize=1)
+        )
+        self._writer: Optional[threading.Thread] = None
+        
         # 加载保存的进度
         if config.auto_resume:
             self._load_progress()
+        
+        # 退出时保存未写入的进度
+        atexit.register(self.flush)
 
     def add_file(self, file_path: Union[str, Path], size: int, total_chunks: int) -> None:
         """添加文件到进度管理器
@@ -97,19 +124,25 @@ class ProgressManager:
             if path_str in self._files:
                 raise ProgressError(f"File already exists: {path_str}")
             
+            now = time.time()
             self._files[path_str] = FileProgress(
                 path=path_str,
                 size=size,
                 total_chunks=total_chunks,
                 completed_chunks=0,
                 tokens_used=0,
-                start_time=time.time(),
-                last_update=time.time(),
+                start_time=now,
+                last_update=now,
                 status=TaskStatus.PENDING,
             )
             
+            self._index_file(path_str, TaskStatus.PENDING)
             self._session.total_files += 1
-            self._save_progress()
+            self._dirty = True
+            
+            # 保存进度
+            if self._should_save_progress():
+                self._save_progress()
             
             log.debug(f"Added file to progress manager: {path_str}")
             
@@ -144,10 +177,17 @@ class ProgressManager:
             
             progress = self._files[path_str]
             
+            # 状态变化时更新状态索引
+            old_status = TaskStatus(progress.status)
+            if status != old_status:
+                del self._by_status[old_status][path_str]
+                self._by_status[TaskStatus(status)][path_str] = None
+            
             # 更新进度信息
+            now = time.time()
             progress.completed_chunks = completed_chunks
             progress.tokens_used = tokens_used
-            progress.last_update = time.time()
+            progress.last_update = now
             progress.status = status
             progress.error = error
             
@@ -155,10 +195,11 @@ class ProgressManager:
             if status in (TaskStatus.SUCCESS, TaskStatus.FAILED):
                 self._session.completed_files += 1
                 self._session.total_tokens += tokens_used
-                self._session.total_cost += self._calculate_cost(tokens_used)
+                self._session.total_cost += tokens_used * _COST_PER_TOKEN
             
             # 更新会话时间
-            self._update_session_time()
+            self._update_session_time(now)
+            self._dirty = True
             
             # 保存进度
             if self._should_save_progress():
@@ -204,10 +245,7 @@ class ProgressManager:
         Returns:
             List[FileProgress]: 待处理文件列表
         """
-        return [
-            f for f in self._files.values()
-            if f.status in (TaskStatus.PENDING, TaskStatus.PAUSED)
-        ]
+        return self._files_with_status(TaskStatus.PENDING, TaskStatus.PAUSED)
 
     def get_failed_files(self) -> List[FileProgress]:
         """获取处理失败的文件
@@ -215,14 +253,24 @@ class ProgressManager:
         Returns:
             List[FileProgress]: 失败文件列表
         """
-        return [f for f in self._files.values() if f.status == TaskStatus.FAILED]
+        return self._files_with_status(TaskStatus.FAILED)
+
+    def flush(self) -> None:
+        """将未保存的进度写入磁盘，并等待后台写入完成"""
+        if self._dirty:
+            self._save_progress()
+        self._save_queue.join()
 
     def clear_progress(self) -> None:
         """清除所有进度信息"""
         self._files.clear()
+        self._order.clear()
+        for paths in self._by_status.values():
+            paths.clear()
+        now = time.time()
         self._session = SessionInfo(
-            start_time=time.time(),
-            last_update=time.time(),
+            start_time=now,
+            last_update=now,
             total_files=0,
             completed_files=0,
             total_tokens=0,
@@ -233,34 +281,91 @@ class ProgressManager:
         log.debug("Cleared all progress information")
 
     def _save_progress(self) -> None:
-        """保存进度信息到文件"""
+        """提交进度快照，由后台线程写入文件
+        
+        快照只复制会话和各文件进度的字段字典，序列化和磁盘写入都不在调用方线程中进行。
+        后台线程还没来得及写入的旧快照会被新快照替换。
+        """
+        snapshot = (
+            vars(self._session).copy(),
+            [(path, vars(progress).copy()) for path, progress in self._files.items()],
+            datetime.now(pytz.UTC).isoformat(),
+        )
+        
+        if self._writer is None:
+            self._writer = threading.Thread(
+                target=self._writer_loop, name="progress-writer", daemon=True
+            )
+            self._writer.start()
+        
+        # 队列已满说明上一份快照还没写入，丢弃它只写最新的
+        while True:
+            try:
+                self._save_queue.put_nowait(snapshot)
+                break
+            except queue.Full:
+                try:
+                    self._save_queue.get_nowait()
+                    self._save_queue.task_done()
+                except queue.Empty:
+                    pass
+        
+        self._dirty = False
+        self._last_save = time.monotonic()
+
+    def _writer_loop(self) -> None:
+        """后台写入线程，依次写入提交的进度快照"""
+        while True:
+            snapshot = self._save_queue.get()
+            try:
+                self._write_progress(*snapshot)
+            except Exception as e:
+                log.error(f"Failed to save progress: {str(e)}")
+            finally:
+                self._save_queue.task_done()
+
+    def _write_progress(
+        self,
+        session: Dict[str, Any],
+        files: List[Tuple[str, Dict[str, Any]]],
+        timestamp: str,
+    ) -> None:
+        """将进度快照写入文件，先写临时文件再原子替换
+        
+        Args:
+            session: 会话信息字段
+            files: 文件路径和进度字段
+            timestamp: 保存时间
+        """
+        # 文件进度逐条序列化后写入，不在内存中构建整个文档
+        save_file = self._save_path / "progress.json"
+        fd, tmp_path = tempfile.mkstemp(dir=self._save_path, suffix=".tmp")
         try:
-            # 准备保存数据
-            data = {
-                "session": asdict(self._session),
-                "files": {
-                    path: asdict(progress)
-                    for path, progress in self._files.items()
-                },
-                "timestamp": datetime.now(pytz.UTC).isoformat(),
-            }
-            
-            # 保存到文件
-            save_file = self._save_path / "progress.json"
-            with save_file.open("w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-            
-            # 如果需要保留历史记录
-            if self.config.keep_history:
-                history_file = self._save_path / f"progress_{int(time.time())}.json"
-                with history_file.open("w", encoding="utf-8") as f:
-                    json.dump(data, f, indent=2, ensure_ascii=False)
-            
-            log.debug("Saved progress information")
-            
-        except Exception as e:
-            log.error(f"Failed to save progress: {str(e)}")
-            raise ProgressError("Failed to save progress", details=str(e))
+            with os.fdopen(fd, "wb") as f:
+                f.write(b'{"session":' + dumps_json(session, compact=True))
+                f.write(b',"files":')
+                f.writelines(iter_json_object(files))
+                f.write(b',"timestamp":' + dumps_json(timestamp, compact=True) + b"}")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, save_file)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+        
+        # 如果需要保留历史记录：进度文件每次都整体替换而不会原地修改，
+        # 硬链接即可保留这一版本，无需再写一份
+        if self.config.keep_history:
+            history_file = self._save_path / f"progress_{int(time.time())}.json"
+            try:
+                if history_file.exists():
+                    history_file.unlink()
+                os.link(save_file, history_file)
+            except OSError:
+                # 文件系统不支持硬链接时复制
+                shutil.copyfile(save_file, history_file)
+        
+        log.debug("Saved progress information")
 
     def _load_progress(self) -> None:
         """从文件加载进度信息"""
@@ -270,8 +375,7 @@ class ProgressManager:
                 return
             
             # 读取保存的数据
-            with save_file.open("r", encoding="utf-8") as f:
-                data = json.load(f)
+            data = loads_json(save_file.read_bytes())
             
             # 恢复会话信息
             session_data = data["session"]
@@ -279,7 +383,9 @@ class ProgressManager:
             
             # 恢复文件进度
             for path, file_data in data["files"].items():
-                self._files[path] = FileProgress(**file_data)
+                progress = FileProgress(**file_data)
+                self._files[path] = progress
+                self._index_file(path, TaskStatus(progress.status))
             
             log.debug("Loaded progress information")
             
@@ -287,9 +393,37 @@ class ProgressManager:
             log.error(f"Failed to load progress: {str(e)}")
             raise ProgressError("Failed to load progress", details=str(e))
 
-    def _update_session_time(self) -> None:
-        """更新会话时间信息"""
-        current_time = time.time()
+    def _files_with_status(self, *statuses: TaskStatus) -> List[FileProgress]:
+        """从状态索引中取出指定状态的文件
+        
+        Args:
+            *statuses: 要查询的状态
+            
+        Returns:
+            List[FileProgress]: 文件进度列表，按文件加入的顺序排列
+        """
+        paths = [path for status in statuses for path in self._by_status[status]]
+        paths.sort(key=self._order.__getitem__)
+        return [self._files[path] for path in paths]
+
+    def _index_file(self, path: str, status: TaskStatus) -> None:
+        """将新文件加入状态索引
+        
+        Args:
+            path: 文件路径
+            status: 文件当前状态
+        """
+        self._order[path] = len(self._order)
+        self._by_status[status][path] = None
+
+    def _update_session_time(self, current_time: Optional[float] = None) -> None:
+        """更新会话时间信息
+        
+        Args:
+            current_time: 当前时间戳，调用方已获取时传入以避免重复调用time.time()
+        """
+        if current_time is None:
+            current_time = time.time()
         self._session.last_update = current_time
         self._session.elapsed_time = current_time - self._session.start_time
 
@@ -299,18 +433,5 @@ class ProgressManager:
         Returns:
             bool: 是否应该保存
         """
-        # 如果距离上次保存时间超过配置的间隔，则保存
-        return (time.time() - self._session.last_update) >= self.config.save_interval
-
-    @staticmethod
-    def _calculate_cost(tokens: int) -> float:
-        """计算token使用成本
-        
-        Args:
-            tokens: 使用的token数
-            
-        Returns:
-            float: 成本（美元）
-        """
-        # 使用GPT-3.5-turbo的价格：$0.002 per 1K tokens
-        return (tokens / 1000) * 0.002 
\ No newline at end of file
+        # 进度有变化且距离上次保存超过配置的间隔时保存
+        return self._dirty and time.monotonic() - self._last_save >= self.config.save_interval
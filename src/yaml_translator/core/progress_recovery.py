@@ -1,15 +1,46 @@
 """
 进度恢复管理模块
 """
-import json
+import atexit
+import dataclasses
 import os
+import tempfile
 import time
-from dataclasses import asdict, dataclass
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+try:
+    import msgpack
+except ImportError:  # msgpack为可选依赖，未安装时检查点使用JSON格式
+    msgpack = None
 
 from ..config import RecoveryConfig
-from ..utils import RecoveryError, log
+from ..utils import RecoveryError, dumps_json, iter_json_array, loads_json, log
+
+# 检查点文件后缀，加载时优先使用MessagePack格式
+_MSGPACK_SUFFIX = ".mp"
+_JSON_SUFFIX = ".json"
+_CHECKPOINT_SUFFIXES = (_MSGPACK_SUFFIX, _JSON_SUFFIX)
+
+
+def _pack_default(obj: Any) -> Any:
+    """将MessagePack不支持的类型转换为可序列化的对象
+    
+    Args:
+        obj: 无法直接序列化的对象
+        
+    Returns:
+        Any: dataclass转为字典，集合转为列表
+        
+    Raises:
+        TypeError: 不支持的类型
+    """
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not serializable")
 
 
 @dataclass
@@ -53,12 +84,22 @@ class ProgressRecoveryManager:
         self._tasks: Dict[str, TaskState] = {}
         self._save_path = Path(config.save_path)
         
+        # 安装了msgpack且未要求可读格式时使用MessagePack保存检查点
+        self._use_msgpack = msgpack is not None and not config.debug_dump_json
+        
+        # 状态有变化且距上次保存超过间隔时才保存
+        self._dirty = False
+        self._last_save = time.monotonic()
+        
         # 创建保存目录
         self._save_path.mkdir(parents=True, exist_ok=True)
         
         # 如果启用自动恢复，尝试加载最新的进度
         if config.auto_resume:
             self._try_auto_resume()
+        
+        # 退出时保存未写入的状态
+        atexit.register(self.flush)
 
     def start_session(self, total_files: int) -> str:
         """开始新会话
@@ -69,11 +110,12 @@ class ProgressRecoveryManager:
         Returns:
             str: 会话ID
         """
-        session_id = str(int(time.time()))
+        now = time.time()
+        session_id = str(int(now))
         self._session = SessionState(
             session_id=session_id,
-            start_time=time.time(),
-            last_update=time.time(),
+            start_time=now,
+            last_update=now,
             total_files=total_files,
             completed_files=0,
             failed_files=set(),
@@ -102,16 +144,18 @@ class ProgressRecoveryManager:
         if not self._session:
             raise RecoveryError("No active session")
         
+        now = time.time()
         self._tasks[task_id] = TaskState(
             task_id=task_id,
             file_path=file_path,
             total_chunks=total_chunks,
             completed_chunks=0,
             failed_chunks=set(),
-            start_time=time.time(),
-            last_update=time.time(),
+            start_time=now,
+            last_update=now,
             is_completed=False,
         )
+        self._dirty = True
         
         # 如果达到保存间隔，保存状态
         if self._should_save():
@@ -153,7 +197,8 @@ class ProgressRecoveryManager:
         if error_message:
             task.error_message = error_message
         
-        task.last_update = time.time()
+        now = time.time()
+        task.last_update = now
         
         # 检查是否完成
         if task.completed_chunks == task.total_chunks:
@@ -167,7 +212,8 @@ class ProgressRecoveryManager:
         if cost:
             self._session.total_cost += cost
         
-        self._session.last_update = time.time()
+        self._session.last_update = now
+        self._dirty = True
         
         # 如果达到保存间隔，保存状态
         if self._should_save():
@@ -188,12 +234,13 @@ class ProgressRecoveryManager:
             raise RecoveryError(f"Task not found: {task_id}")
         
         # 更新任务状态
+        now = time.time()
         task.error_message = str(error)
-        task.last_update = time.time()
+        task.last_update = now
         
         # 更新会话状态
         self._session.failed_files.add(task.file_path)
-        self._session.last_update = time.time()
+        self._session.last_update = now
         
         # 保存状态
         self._save_state()
@@ -232,20 +279,24 @@ class ProgressRecoveryManager:
         
         self._save_state()
 
+    def flush(self) -> None:
+        """将未保存的状态写入磁盘"""
+        if self._dirty:
+            self._save_state()
+
     def load_checkpoint(self, session_id: str) -> None:
         """加载检查点
         
         Args:
             session_id: 会话ID
         """
-        checkpoint_file = self._save_path / f"{session_id}.json"
-        if not checkpoint_file.exists():
+        checkpoint_file = self._find_checkpoint(session_id)
+        if checkpoint_file is None:
             raise RecoveryError(f"Checkpoint not found: {session_id}")
         
         try:
             # 加载状态
-            with open(checkpoint_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            data = self._read_checkpoint(checkpoint_file)
             
             # 恢复会话状态
             self._session = SessionState(**data["session"])
@@ -276,7 +327,7 @@ class ProgressRecoveryManager:
             current_time = time.time()
             
             # 遍历检查点文件
-            for checkpoint_file in self._save_path.glob("*.json"):
+            for checkpoint_file in self._list_checkpoints():
                 # 检查文件年龄
                 file_age = current_time - checkpoint_file.stat().st_mtime
                 if file_age > max_age:
@@ -291,9 +342,8 @@ class ProgressRecoveryManager:
         if not self._session:
             return False
         
-        # 检查距离上次保存的时间
-        time_since_save = time.time() - self._session.last_update
-        return time_since_save >= self.config.save_interval
+        # 状态有变化且距离上次保存超过间隔时保存
+        return self._dirty and time.monotonic() - self._last_save >= self.config.save_interval
 
     def _save_state(self) -> None:
         """保存当前状态"""
@@ -301,25 +351,41 @@ class ProgressRecoveryManager:
             return
         
         try:
-            # 准备保存数据
-            data = {
-                "session": {
-                    **asdict(self._session),
-                    "failed_files": list(self._session.failed_files),
-                },
-                "tasks": [
-                    {
-                        **asdict(task),
-                        "failed_chunks": list(task.failed_chunks),
-                    }
-                    for task in self._tasks.values()
-                ],
-            }
+            # 保存到文件：任务逐条序列化后写入临时文件，落盘后原子替换，
+            # 写入中途退出也不会损坏已有的检查点
+            session_id = self._session.session_id
+            suffix = _MSGPACK_SUFFIX if self._use_msgpack else _JSON_SUFFIX
+            checkpoint_file = self._save_path / f"{session_id}{suffix}"
+            fd, tmp_path = tempfile.mkstemp(dir=self._save_path, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    if self._use_msgpack:
+                        packer = msgpack.Packer(default=_pack_default, use_bin_type=True)
+                        f.write(packer.pack_map_header(2))
+                        f.write(packer.pack("session") + packer.pack(self._session))
+                        f.write(packer.pack("tasks") + packer.pack_array_header(len(self._tasks)))
+                        for task in self._tasks.values():
+                            f.write(packer.pack(task))
+                    else:
+                        f.write(b'{"session":' + dumps_json(self._session, compact=True))
+                        f.write(b',"tasks":')
+                        f.writelines(iter_json_array(self._tasks.values()))
+                        f.write(b"}")
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, checkpoint_file)
+            except Exception:
+                os.unlink(tmp_path)
+                raise
+            
+            # 删除同一会话另一种格式的旧检查点，避免加载时读到过期的状态
+            for suffix in _CHECKPOINT_SUFFIXES:
+                stale_file = self._save_path / f"{session_id}{suffix}"
+                if stale_file != checkpoint_file and stale_file.exists():
+                    stale_file.unlink()
             
-            # 保存到文件
-            checkpoint_file = self._save_path / f"{self._session.session_id}.json"
-            with open(checkpoint_file, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            self._dirty = False
+            self._last_save = time.monotonic()
             
             log.debug(f"已保存进度到: {checkpoint_file}")
             
@@ -330,7 +396,7 @@ class ProgressRecoveryManager:
         """尝试自动恢复最新的进度"""
         try:
             # 查找最新的检查点
-            checkpoints = list(self._save_path.glob("*.json"))
+            checkpoints = self._list_checkpoints()
             if not checkpoints:
                 return
             
@@ -347,4 +413,50 @@ class ProgressRecoveryManager:
             log.info("已自动恢复最新进度")
             
         except Exception as e:
-            log.error(f"自动恢复失败: {str(e)}") 
\ No newline at end of file
+            log.error(f"自动恢复失败: {str(e)}")
+
+    def _list_checkpoints(self) -> List[Path]:
+        """列出所有格式的检查点文件
+        
+        Returns:
+            List[Path]: 检查点文件路径列表
+        """
+        return [
+            path for suffix in _CHECKPOINT_SUFFIXES
+            for path in self._save_path.glob(f"*{suffix}")
+        ]
+
+    def _find_checkpoint(self, session_id: str) -> Optional[Path]:
+        """查找会话的检查点文件，优先使用MessagePack格式，兼容旧的JSON格式
+        
+        Args:
+            session_id: 会话ID
+            
+        Returns:
+            Optional[Path]: 检查点文件路径，不存在时返回None
+        """
+        for suffix in _CHECKPOINT_SUFFIXES:
+            checkpoint_file = self._save_path / f"{session_id}{suffix}"
+            if checkpoint_file.exists():
+                return checkpoint_file
+        return None
+
+    @staticmethod
+    def _read_checkpoint(checkpoint_file: Path) -> Dict[str, Any]:
+        """按文件格式读取检查点
+        
+        Args:
+            checkpoint_file: 检查点文件路径
+            
+        Returns:
+            Dict[str, Any]: 检查点数据
+            
+        Raises:
+            RecoveryError: 检查点为MessagePack格式但未安装msgpack
+        """
+        raw = checkpoint_file.read_bytes()
+        if checkpoint_file.suffix == _MSGPACK_SUFFIX:
+            if msgpack is None:
+                raise RecoveryError("读取MessagePack格式的检查点需要安装msgpack")
+            return msgpack.unpackb(raw, raw=False)
+        return loads_json(raw)
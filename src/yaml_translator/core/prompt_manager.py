@@ -2,15 +2,59 @@
 提示词管理模块
 """
 import json
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 from string import Template
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, FrozenSet, List, Mapping, Optional, Tuple, Union
 
 from ..config import PromptsConfig
 from ..utils import PromptError, log
 
 
+class _SafeDict(dict):
+    """format_map使用的变量字典，缺少的变量保留模板中的原文"""
+
+    def __init__(self, variables: Mapping[str, Any], fallbacks: Dict[str, str]):
+        super().__init__(variables)
+        self._fallbacks = fallbacks
+
+    def __missing__(self, key: str) -> str:
+        return self._fallbacks[key]
+
+
+def _to_format_string(content: str) -> Optional[Tuple[str, Dict[str, str]]]:
+    """将 string.Template 模板转换为等价的 str.format 格式串
+    
+    Args:
+        content: 模板内容
+        
+    Returns:
+        Optional[Tuple[str, Dict[str, str]]]: 格式串和各变量在模板中的原文；
+            同一变量以 $name 和 ${name} 两种写法出现时无法保留原文，返回None
+    """
+    parts = []
+    fallbacks: Dict[str, str] = {}
+    position = 0
+    for match in Template.pattern.finditer(content):
+        parts.append(content[position:match.start()].replace("{", "{{").replace("}", "}}"))
+        position = match.end()
+        
+        name = match.group("named") or match.group("braced")
+        if name is None:
+            # 与 safe_substitute 一致：$$ 转义为 $，无效的 $ 原样保留
+            text = "$" if match.group("escaped") is not None else match.group(0)
+            parts.append(text.replace("{", "{{").replace("}", "}}"))
+            continue
+        
+        original = match.group(0)
+        if fallbacks.setdefault(name, original) != original:
+            return None
+        parts.append("{" + name + "}")
+    
+    parts.append(content[position:].replace("{", "{{").replace("}", "}}"))
+    return "".join(parts), fallbacks
+
+
 @dataclass
 class PromptTemplate:
     """提示词模板"""
@@ -20,6 +64,53 @@ class PromptTemplate:
     variables: Dict[str, str] = None  # 变量说明
     category: Optional[str] = None  # 模板分类
     version: str = "1.0"  # 模板版本
+    
+    # 解析后的模板和其中的变量名，首次使用时生成，内容变化后重新生成
+    _compiled: Optional[Template] = field(default=None, init=False, repr=False, compare=False)
+    _identifiers: Optional[FrozenSet[str]] = field(default=None, init=False, repr=False, compare=False)
+    # 转换后的格式串，渲染时用C实现的 str.format_map 代替 safe_substitute
+    _format: Optional[Tuple[str, Optional[Tuple[str, Dict[str, str]]]]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    @property
+    def compiled(self) -> Template:
+        """解析后的模板"""
+        if self._compiled is None or self._compiled.template is not self.content:
+            self._compiled = Template(self.content)
+            self._identifiers = None
+        return self._compiled
+
+    @property
+    def identifiers(self) -> FrozenSet[str]:
+        """模板中使用的变量名"""
+        compiled = self.compiled
+        if self._identifiers is None:
+            self._identifiers = frozenset(compiled.get_identifiers())
+        return self._identifiers
+
+    def substitute(self, variables: Mapping[str, Any]) -> str:
+        """代入变量渲染模板，结果与 Template.safe_substitute 相同
+        
+        Args:
+            variables: 变量值字典，缺少的变量保留原文
+            
+        Returns:
+            str: 渲染后的文本
+        """
+        if self._format is None or self._format[0] is not self.content:
+            self._format = (self.content, _to_format_string(self.content))
+        
+        converted = self._format[1]
+        if converted is None:
+            return self.compiled.safe_substitute(variables)
+        
+        fmt, fallbacks = converted
+        try:
+            return fmt.format_map(variables)
+        except KeyError:
+            # 有变量未提供时才构建保留原文的字典
+            return fmt.format_map(_SafeDict(variables, fallbacks))
 
 
 class PromptManager:
@@ -83,14 +174,41 @@ class PromptManager:
             if not variables:
                 return template.content
             
-            # 渲染模板
-            return Template(template.content).safe_substitute(variables)
+            # 渲染模板（复用已转换的格式串）
+            return template.substitute(variables)
             
         except KeyError as e:
             raise PromptError(f"Missing variable: {str(e)}")
         except Exception as e:
             raise PromptError(f"Failed to render template: {str(e)}")
 
+    def compile(self, name: str) -> Callable[[Optional[Dict[str, Any]]], str]:
+        """预编译提示词模板
+        
+        模板只解析一次，返回的函数只负责代入变量，适合在循环中重复渲染同一个模板。
+        
+        Args:
+            name: 模板名称
+            
+        Returns:
+            Callable[[Optional[Dict[str, Any]]], str]: 渲染函数，参数为变量值字典
+            
+        Raises:
+            PromptError: 模板不存在
+        """
+        template = self.get_template(name)
+        content = template.content
+        
+        def render(variables: Optional[Dict[str, Any]] = None) -> str:
+            try:
+                if not variables:
+                    return content
+                return template.substitute(variables)
+            except Exception as e:
+                raise PromptError(f"Failed to render template: {str(e)}")
+        
+        return render
+
     def add_template(self, template: PromptTemplate) -> None:
         """添加提示词模板
         
@@ -234,14 +352,13 @@ class PromptManager:
             
             # 检查变量定义
             if template.variables:
-                # 尝试解析模板中的变量
+                # 尝试解析模板中的变量（解析结果缓存在模板上，渲染时复用）
                 try:
-                    Template(template.content).pattern
+                    template_vars = template.identifiers
                 except Exception as e:
                     raise PromptError(f"Invalid template variables: {str(e)}")
                 
                 # 检查所有声明的变量是否在内容中使用
-                template_vars = set(Template(template.content).get_identifiers())
                 declared_vars = set(template.variables.keys())
                 
                 # 检查未声明的变量
@@ -0,0 +1,195 @@
+"""
+翻译缓存模块
+"""
+import asyncio
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Optional
+
+from ..config import CacheConfig
+from ..utils import log
+
+
+class TranslationCache:
+    """翻译缓存
+
+    以文本哈希为键缓存翻译结果，内存中按LRU淘汰，可选持久化到SQLite。
+    相同的键正在计算时，后来的调用等待同一个结果。
+    """
+
+    def __init__(self, config: CacheConfig):
+        """初始化翻译缓存
+        
+        Args:
+            config: 缓存配置
+        """
+        self.config = config
+        self._memory: "OrderedDict[bytes, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._pending: Dict[bytes, "asyncio.Future[str]"] = {}
+        
+        if config.persist:
+            self._open_db(Path(config.path).expanduser())
+
+    @staticmethod
+    def make_key(*parts: str) -> bytes:
+        """计算缓存键
+        
+        Args:
+            *parts: 参与计算的文本，如模型名、提示词和原文
+        
+        Returns:
+            bytes: 16字节的blake2b摘要
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        for part in parts:
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.digest()
+
+    def get(self, key: bytes) -> Optional[str]:
+        """获取缓存的翻译
+        
+        Args:
+            key: 缓存键
+        
+        Returns:
+            Optional[str]: 翻译结果，未命中时返回None
+        """
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                return value
+            
+            if self._db is None:
+                return None
+            
+            try:
+                row = self._db.execute(
+                    "SELECT value FROM translations WHERE key = ?", (key,)
+                ).fetchone()
+            except sqlite3.Error as e:
+                log.warning(f"读取翻译缓存失败: {str(e)}")
+                return None
+            
+            if row is None:
+                return None
+            
+            # 磁盘命中后放入内存
+            self._remember(key, row[0])
+            return row[0]
+
+    def set(self, key: bytes, value: str) -> None:
+        """写入翻译结果
+        
+        Args:
+            key: 缓存键
+            value: 翻译结果
+        """
+        with self._lock:
+            self._remember(key, value)
+            
+            if self._db is None:
+                return
+            
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO translations (key, value) VALUES (?, ?)",
+                    (key, value),
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                log.warning(f"写入翻译缓存失败: {str(e)}")
+
+    async def get_or_compute(self, key: bytes, compute: Callable[[], Awaitable[str]]) -> str:
+        """获取缓存的翻译，未命中时计算并写入缓存
+        
+        相同的键正在计算时等待其结果，不会重复计算。计算失败时不写入缓存，
+        异常同时传给所有等待者。
+        
+        Args:
+            key: 缓存键
+            compute: 未命中时调用，返回翻译结果的协程函数
+        
+        Returns:
+            str: 翻译结果
+        """
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        
+        # 相同的键正在计算时等待其结果
+        pending = self._pending.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        
+        future: "asyncio.Future[str]" = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        try:
+            value = await compute()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # 避免无人等待时出现未取回异常的警告
+            future.exception()
+            raise
+        else:
+            self.set(key, value)
+            future.set_result(value)
+            return value
+        finally:
+            del self._pending[key]
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM translations")
+                self._db.commit()
+
+    def close(self) -> None:
+        """关闭缓存数据库"""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def _remember(self, key: bytes, value: str) -> None:
+        """写入内存缓存并按LRU淘汰
+        
+        Args:
+            key: 缓存键
+            value: 翻译结果
+        """
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.config.max_entries:
+            self._memory.popitem(last=False)
+
+    def _open_db(self, path: Path) -> None:
+        """打开缓存数据库，失败时只使用内存缓存
+        
+        Args:
+            path: 数据库路径
+        """
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(path), check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS translations "
+                "(key BLOB PRIMARY KEY, value TEXT NOT NULL)"
+            )
+            self._db.commit()
+        except (OSError, sqlite3.Error) as e:
+            log.warning(f"无法打开翻译缓存数据库，仅使用内存缓存: {str(e)}")
+            self._db = None
@@ -9,7 +9,7 @@ import openai
 from openai import AsyncOpenAI
 from pydantic import BaseModel
 
-from ..config import APIConfig, BlacklistConfig, TranslationConfig
+from ..config import APIConfig, BlacklistConfig, CacheConfig, TranslationConfig
 from ..utils import (
     APIError,
     AuthenticationError,
@@ -19,6 +19,7 @@ from ..utils import (
     TranslationError,
     log,
 )
+from .translation_cache import TranslationCache
 
 
 class TranslationRequest(BaseModel):
@@ -46,6 +47,7 @@ class Translator:
         api_config: APIConfig,
         translation_config: TranslationConfig,
         blacklist_config: BlacklistConfig,
+        cache_config: Optional[CacheConfig] = None,
     ):
         """初始化翻译器
         
@@ -53,6 +55,7 @@ class Translator:
             api_config: API配置
             translation_config: 翻译配置
             blacklist_config: 黑名单配置
+            cache_config: 翻译缓存配置，为None时不缓存
         """
         self.api_config = api_config
         self.translation_config = translation_config
@@ -67,6 +70,11 @@ class Translator:
         
         # 初始化重试计数器
         self._retry_counts: Dict[str, int] = {}
+        
+        # 初始化翻译缓存，相同的块只请求一次
+        self._cache: Optional[TranslationCache] = None
+        if cache_config is not None and cache_config.enabled:
+            self._cache = TranslationCache(cache_config)
 
     async def translate(self, text: str, prompt: str) -> TranslationResponse:
         """翻译文本
@@ -82,6 +90,42 @@ class Translator:
             TranslationError: 翻译错误
             APIError: API调用错误
         """
+        if self._cache is None:
+            return await self._translate(text, prompt)
+        
+        key = TranslationCache.make_key(self.api_config.model, prompt, text)
+        response: Optional[TranslationResponse] = None
+        
+        async def compute() -> str:
+            nonlocal response
+            response = await self._translate(text, prompt)
+            return response.translated_text
+        
+        translated_text = await self._cache.get_or_compute(key, compute)
+        if response is not None:
+            return response
+        
+        # 命中缓存或复用了其他调用的结果，没有消耗令牌
+        return TranslationResponse(
+            translated_text=translated_text,
+            tokens_used=0,
+            model_used=self.api_config.model,
+            time_taken=0.0,
+        )
+
+    async def _translate(self, text: str, prompt: str) -> TranslationResponse:
+        """调用API翻译文本，不经过缓存
+        
+        Args:
+            text: 要翻译的文本
+            prompt: 翻译提示词
+            
+        Returns:
+            TranslationResponse: 翻译响应
+            
+        Raises:
+            TranslationError: 翻译错误
+        """
         # 保护黑名单词汇
         protected_text = self._protect_blacklist_words(text)
         
@@ -114,7 +158,7 @@ class Translator:
             
         except Exception as e:
             log.error(f"Translation failed: {str(e)}")
-            raise TranslationError("Translation failed", details=str(e))
+            raise TranslationError("Translation failed", details=str(e)) from e
 
     async def translate_batch(
         self,
@@ -240,4 +284,6 @@ class Translator:
 
     async def close(self) -> None:
         """关闭翻译器，清理资源"""
-        await self._client.close() 
\ No newline at end of file
+        await self._client.close()
+        if self._cache is not None:
+            self._cache.close() 
\ No newline at end of file
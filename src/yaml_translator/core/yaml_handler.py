@@ -1,9 +1,12 @@
 """
 YAML文件处理模块
 """
+import asyncio
+import os
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Generator, List, Optional, Tuple, Union
 
+import aiofiles
 import pkvpm
 from deepdiff import DeepDiff
 
@@ -85,6 +88,220 @@ class YAMLHandler:
             log.error(f"Error writing file {file_path}: {str(e)}")
             raise YAMLError(f"Error writing file {file_path}", details=str(e))
 
+    async def aread_file(self, file_path: Union[str, Path]) -> List[Dict[str, Any]]:
+        """异步读取YAML文件
+        
+        文件读取不阻塞事件循环，解析在线程池中执行。
+        
+        Args:
+            file_path: YAML文件路径
+            
+        Returns:
+            List[Dict[str, Any]]: YAML文档列表，每个文档是一个字典
+            
+        Raises:
+            YAMLError: YAML解析错误
+            FileNotFoundError: 文件不存在
+        """
+        try:
+            path = Path(file_path)
+            if not path.exists():
+                raise FileNotFoundError(f"File not found: {file_path}")
+
+            log.debug(f"Reading YAML file: {file_path}")
+            async with aiofiles.open(path, "r", encoding="utf-8") as f:
+                content = await f.read()
+            
+            loop = asyncio.get_running_loop()
+            documents = await loop.run_in_executor(
+                None, lambda: list(pkvpm.load_all(content))
+            )
+            log.debug(f"Successfully read {len(documents)} YAML documents from {file_path}")
+            return documents
+
+        except pkvpm.YAMLError as e:
+            log.error(f"Failed to parse YAML file {file_path}: {str(e)}")
+            raise YAMLError(f"Failed to parse YAML file {file_path}", details=str(e))
+        except Exception as e:
+            log.error(f"Error reading file {file_path}: {str(e)}")
+            raise YAMLError(f"Error reading file {file_path}", details=str(e))
+
+    async def awrite_file(
+        self,
+        file_path: Union[str, Path],
+        documents: List[Dict[str, Any]],
+        backup: bool = True,
+    ) -> None:
+        """异步写入YAML文件
+        
+        序列化在线程池中执行，文件写入不阻塞事件循环。
+        
+        Args:
+            file_path: YAML文件路径
+            documents: YAML文档列表
+            backup: 是否备份原文件
+            
+        Raises:
+            YAMLError: YAML写入错误
+            BackupError: 备份失败
+        """
+        path = Path(file_path)
+        
+        try:
+            loop = asyncio.get_running_loop()
+            content = await loop.run_in_executor(None, pkvpm.dump_all, documents)
+            
+            # 如果需要备份且文件存在
+            if backup and path.exists():
+                self._backup_file(path)
+
+            log.debug(f"Writing YAML file: {file_path}")
+            async with aiofiles.open(path, "w", encoding="utf-8") as f:
+                await f.write(content)
+            log.debug(f"Successfully wrote {len(documents)} YAML documents to {file_path}")
+
+        except Exception as e:
+            log.error(f"Error writing file {file_path}: {str(e)}")
+            raise YAMLError(f"Error writing file {file_path}", details=str(e))
+
+    def iter_chunks(
+        self,
+        file_path: Union[str, Path],
+        chunk_size: int,
+    ) -> Generator[str, None, None]:
+        """逐行读取YAML文件并按顶层条目分块
+        
+        只在顶层条目（无缩进的键、列表项或文档分隔符）开始处切分，
+        每个块在累计达到chunk_size个字符后结束，块内容保留原始换行。
+        
+        Args:
+            file_path: YAML文件路径
+            chunk_size: 每个块的目标字符数
+            
+        Yields:
+            str: 块内容，所有块按顺序拼接即为原文
+            
+        Raises:
+            YAMLError: 读取错误
+        """
+        try:
+            path = Path(file_path)
+            buffer: List[str] = []
+            size = 0
+            
+            with path.open("r", encoding="utf-8") as f:
+                for line in f:
+                    if buffer and size >= chunk_size and self._is_top_level_start(line):
+                        yield "".join(buffer)
+                        buffer = []
+                        size = 0
+                    
+                    buffer.append(line)
+                    size += len(line)
+            
+            if buffer:
+                yield "".join(buffer)
+                
+        except Exception as e:
+            log.error(f"Error reading file {file_path}: {str(e)}")
+            raise YAMLError(f"Error reading file {file_path}", details=str(e))
+
+    async def aiter_chunks(
+        self,
+        file_path: Union[str, Path],
+        chunk_size: int,
+    ) -> AsyncIterator[str]:
+        """异步逐行读取YAML文件并按顶层条目分块
+        
+        与 iter_chunks 的分块方式相同，读取不阻塞事件循环。
+        
+        Args:
+            file_path: YAML文件路径
+            chunk_size: 每个块的目标字符数
+            
+        Yields:
+            str: 块内容，所有块按顺序拼接即为原文
+            
+        Raises:
+            YAMLError: 读取错误
+        """
+        try:
+            buffer: List[str] = []
+            size = 0
+            
+            async with aiofiles.open(Path(file_path), "r", encoding="utf-8") as f:
+                async for line in f:
+                    if buffer and size >= chunk_size and self._is_top_level_start(line):
+                        yield "".join(buffer)
+                        buffer = []
+                        size = 0
+                    
+                    buffer.append(line)
+                    size += len(line)
+            
+            if buffer:
+                yield "".join(buffer)
+                
+        except Exception as e:
+            log.error(f"Error reading file {file_path}: {str(e)}")
+            raise YAMLError(f"Error reading file {file_path}", details=str(e))
+
+    async def awrite_chunks(
+        self,
+        file_path: Union[str, Path],
+        chunks: AsyncIterable[str],
+        backup: bool = True,
+    ) -> None:
+        """逐块异步写入文件
+        
+        每得到一块就写入同目录下的临时文件，全部写完后再备份原文件并替换，
+        内存中不需要保存完整的文件内容，中途失败时原文件保持不变。
+        
+        Args:
+            file_path: 文件路径
+            chunks: 按顺序产生的文件内容片段
+            backup: 是否备份原文件
+            
+        Raises:
+            YAMLError: 写入错误
+            BackupError: 备份失败
+        """
+        path = Path(file_path)
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        
+        try:
+            log.debug(f"Writing file: {file_path}")
+            async with aiofiles.open(tmp_path, "w", encoding="utf-8") as f:
+                async for chunk in chunks:
+                    await f.write(chunk)
+            
+            # 如果需要备份且文件存在
+            if backup and path.exists():
+                self._backup_file(path)
+            
+            os.replace(tmp_path, path)
+            log.debug(f"Successfully wrote file: {file_path}")
+            
+        except Exception as e:
+            if tmp_path.exists():
+                tmp_path.unlink()
+            log.error(f"Error writing file {file_path}: {str(e)}")
+            if isinstance(e, BackupError):
+                raise
+            raise YAMLError(f"Error writing file {file_path}", details=str(e))
+
+    @staticmethod
+    def _is_top_level_start(line: str) -> bool:
+        """检查行是否是顶层条目的开始
+        
+        Args:
+            line: 文本行
+            
+        Returns:
+            bool: 是否是顶层条目的开始
+        """
+        return bool(line) and line[0] not in " \t#\r\n"
+
     def update_file(self, file_path: Union[str, Path], updates: Dict[str, Any], backup: bool = True) -> None:
         """更新YAML文件中的值
         
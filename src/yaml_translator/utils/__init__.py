@@ -1,3 +1,4 @@
+from .compat import DATACLASS_OPTIONS
 from .exceptions import (
     APIError,
     AuthenticationError,
@@ -20,6 +21,7 @@ from .exceptions import (
     YAMLError,
     YAMLTranslatorError,
 )
+from .json_io import dumps_json, iter_json_array, iter_json_object, loads_json
 from .logger import log
 
 __all__ = [
@@ -30,6 +32,7 @@ __all__ = [
     "ChunkError",
     "ConcurrencyError",
     "ConfigError",
+    "DATACLASS_OPTIONS",
     "DisplayError",
     "FileError",
     "LoggingError",
@@ -43,5 +46,9 @@ __all__ = [
     "ValidationError",
     "YAMLError",
     "YAMLTranslatorError",
+    "dumps_json",
+    "iter_json_array",
+    "iter_json_object",
+    "loads_json",
     "log",
 ] 
\ No newline at end of file
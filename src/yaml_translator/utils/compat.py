@@ -0,0 +1,8 @@
+"""
+Python版本兼容模块
+"""
+import sys
+from typing import Any, Dict
+
+# Python 3.10起dataclass支持slots，频繁创建的dataclass去掉实例字典可减少内存占用
+DATACLASS_OPTIONS: Dict[str, Any] = {"slots": True} if sys.version_info >= (3, 10) else {}
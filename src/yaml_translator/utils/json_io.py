@@ -0,0 +1,103 @@
+"""
+JSON读写模块
+"""
+import dataclasses
+import json
+from typing import Any, Iterable, Iterator, Tuple, Union
+
+try:
+    import orjson
+except ImportError:  # orjson为可选依赖，未安装时使用标准库json
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    """序列化JSON原生不支持的类型：集合转为列表，dataclass转为字典
+    
+    Args:
+        obj: 无法直接序列化的对象
+        
+    Returns:
+        Any: 可序列化的对象
+        
+    Raises:
+        TypeError: 不支持的类型
+    """
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps_json(data: Any, *, compact: bool = False) -> bytes:
+    """将数据序列化为缩进2格的UTF-8 JSON
+    
+    dataclass实例和集合可直接序列化，集合输出为列表。
+    
+    Args:
+        data: 要序列化的数据
+        compact: 是否输出不带缩进和多余空格的紧凑格式，用于网络请求等无需阅读的场景
+        
+    Returns:
+        bytes: JSON字节串
+    """
+    if orjson is not None:
+        if compact:
+            return orjson.dumps(data, default=_default, option=orjson.OPT_NON_STR_KEYS)
+        return orjson.dumps(
+            data, default=_default, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        )
+    if compact:
+        return json.dumps(
+            data, default=_default, ensure_ascii=False, separators=(",", ":")
+        ).encode("utf-8")
+    return json.dumps(data, default=_default, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+def loads_json(raw: Union[bytes, str]) -> Any:
+    """解析JSON
+    
+    Args:
+        raw: JSON字节串或字符串
+        
+    Returns:
+        Any: 解析结果
+    """
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def iter_json_object(items: Iterable[Tuple[str, Any]]) -> Iterator[bytes]:
+    """逐项生成紧凑JSON对象的字节片段
+    
+    每次只序列化一个值，写入文件时无需先构建整个对象的字节串。
+    
+    Args:
+        items: 键值对
+        
+    Yields:
+        bytes: JSON片段，依次拼接即为完整的JSON对象
+    """
+    separator = b"{"
+    for key, value in items:
+        yield separator + dumps_json(key, compact=True) + b":" + dumps_json(value, compact=True)
+        separator = b","
+    yield b"{}" if separator == b"{" else b"}"
+
+
+def iter_json_array(values: Iterable[Any]) -> Iterator[bytes]:
+    """逐项生成紧凑JSON数组的字节片段
+    
+    Args:
+        values: 数组元素
+        
+    Yields:
+        bytes: JSON片段，依次拼接即为完整的JSON数组
+    """
+    separator = b"["
+    for value in values:
+        yield separator + dumps_json(value, compact=True)
+        separator = b","
+    yield b"[]" if separator == b"[" else b"]"
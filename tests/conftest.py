@@ -0,0 +1,14 @@
+"""
+测试公共夹具
+"""
+import pytest
+
+from yaml_translator.config import LoggingConfig
+from yaml_translator.utils import log
+
+
+@pytest.fixture(autouse=True, scope="session")
+def setup_logging(tmp_path_factory):
+    """配置日志，被测代码在未配置日志时会抛出LoggingError"""
+    log.setup(LoggingConfig(), tmp_path_factory.mktemp("logs"))
+    log.set_level("ERROR")
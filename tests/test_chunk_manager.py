@@ -0,0 +1,46 @@
+"""
+分块管理测试
+"""
+from yaml_translator.config import Config
+from yaml_translator.core import ChunkManager
+
+
+def _manager(chunk_size: int = 2000, **changes) -> ChunkManager:
+    """使用默认配置创建分块管理器，changes覆盖分块配置中的字段"""
+    config = Config()
+    return ChunkManager(config.chunk.model_copy(update=changes), chunk_size)
+
+
+def test_reads_chunk_config():
+    manager = _manager(max_chunk_size=20, split_keywords=["###"])
+    text = "a: 1\nb: 2\n### section\nc: 3\nd: 4\ne: 5\nf: 6\ng: 7\n"
+
+    chunks = manager.split_text(text)
+
+    # 关键字行开始新的块，每个块不超过最大字符数（单行超长时除外）
+    assert any(chunk.content.startswith("### section") for chunk in chunks)
+    assert all(len(chunk.content) <= 20 for chunk in chunks)
+
+
+def test_merge_chunks_round_trip():
+    texts = [
+        "a\n\nb\nc\n",
+        "\n\na: 1\n\n\nb: 2",
+        "a: 1\r\n\r\nb: 2\r\n",
+        "".join(f"k{i}: v\n" + "\n" * (i % 3) for i in range(30)),
+    ]
+    for chunk_size in (1, 2, 5):
+        for text in texts:
+            manager = _manager(chunk_size)
+            merged = manager.merge_chunks(manager.split_content(text))
+            assert merged == text.replace("\r\n", "\n")
+
+
+def test_merge_chunks_restores_line_endings():
+    manager = _manager(1)
+    chunks = manager.split_content("a\n\nb\nc\n")
+
+    # 译文去掉了末尾换行
+    merged = manager.merge_chunks([chunk.rstrip("\n").upper() for chunk in chunks])
+
+    assert merged == "A\n\nB\nC\n"
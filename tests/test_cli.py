@@ -0,0 +1,146 @@
+"""
+翻译流程测试
+"""
+import asyncio
+from pathlib import Path
+
+from yaml_translator import cli, core
+from yaml_translator.config import (
+    APIConfig,
+    BlacklistConfig,
+    CacheConfig,
+    Config,
+    PromptsConfig,
+    TranslationConfig,
+)
+from yaml_translator.core import YAMLHandler
+
+SOURCE = "".join(f"key{i}: value {i}\n" for i in range(40))
+
+
+class StubResponse:
+    """只有译文的翻译响应"""
+
+    def __init__(self, translated_text: str):
+        self.translated_text = translated_text
+
+
+class StubTranslator:
+    """把文本转为大写的翻译器，和真实模型一样去掉末尾换行"""
+
+    def __init__(self, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+
+    async def translate(self, text: str, prompt: str) -> StubResponse:
+        return StubResponse(text.upper().rstrip("\n"))
+
+    async def close(self) -> None:
+        pass
+
+
+class StubPromptManager:
+    """直接使用原文作为提示词"""
+
+    def __init__(self, config=None):
+        self.config = config
+
+    def compile(self, name: str):
+        return lambda variables: variables["text"]
+
+
+class StubYAMLHandler:
+    """以纯文本读写文件的YAML处理器"""
+
+    def __init__(self, config=None):
+        self.config = config
+
+    async def aread_file(self, file_path: Path) -> str:
+        return Path(file_path).read_text(encoding="utf-8")
+
+    async def awrite_file(self, file_path: Path, content: str) -> None:
+        Path(file_path).write_text(content, encoding="utf-8")
+
+
+def _chunk_config(config: Config, **changes) -> Config:
+    """返回修改了分块配置的配置副本"""
+    return config.model_copy(update={"chunk": config.chunk.model_copy(update=changes)})
+
+
+def test_config_has_chunk_section():
+    config = Config()
+    assert config.chunk.stream_threshold > 0
+    assert config.chunk.max_chunk_size > 0
+
+
+def test_process_file(tmp_path):
+    file_path = tmp_path / "test.yaml"
+    file_path.write_text(SOURCE, encoding="utf-8")
+    config = Config()
+    config = config.model_copy(
+        update={"translation": config.translation.model_copy(update={"chunk_size": 7})}
+    )
+
+    asyncio.run(
+        cli._process_file(
+            file_path,
+            config,
+            StubYAMLHandler(),
+            StubPromptManager(),
+            StubTranslator(),
+            None,
+            asyncio.Semaphore(2),
+        )
+    )
+
+    assert file_path.read_text(encoding="utf-8") == SOURCE.upper()
+
+
+def test_process_file_streaming(tmp_path):
+    file_path = tmp_path / "test.yaml"
+    file_path.write_text(SOURCE, encoding="utf-8")
+    config = _chunk_config(Config(), stream_threshold=0, max_chunk_size=64)
+
+    asyncio.run(
+        cli._process_file(
+            file_path,
+            config,
+            YAMLHandler(config.yaml),
+            StubPromptManager(),
+            StubTranslator(),
+            None,
+            asyncio.Semaphore(2),
+        )
+    )
+
+    assert file_path.read_text(encoding="utf-8") == SOURCE.upper()
+
+
+def test_process_file_in_worker(tmp_path, monkeypatch):
+    file_path = tmp_path / "test.yaml"
+    file_path.write_text(SOURCE, encoding="utf-8")
+    config = _chunk_config(Config(), stream_threshold=0, max_chunk_size=64)
+
+    created = {}
+
+    def make_translator(*args, **kwargs):
+        created["translator"] = StubTranslator(*args, **kwargs)
+        return created["translator"]
+
+    def make_prompt_manager(config):
+        created["prompt_manager"] = StubPromptManager(config)
+        return created["prompt_manager"]
+
+    monkeypatch.setattr(core, "Translator", make_translator)
+    monkeypatch.setattr(core, "PromptManager", make_prompt_manager)
+
+    task_id, error = cli._process_file_in_worker((str(file_path), config.model_dump()))
+
+    assert (task_id, error) == (str(file_path), None)
+    assert file_path.read_text(encoding="utf-8") == SOURCE.upper()
+
+    # 子进程按Translator和PromptManager的签名传入各自的配置
+    translator = created["translator"]
+    assert [type(arg) for arg in translator.args] == [APIConfig, TranslationConfig, BlacklistConfig]
+    assert isinstance(translator.kwargs["cache_config"], CacheConfig)
+    assert isinstance(created["prompt_manager"].config, PromptsConfig)